@@ -9,29 +9,38 @@ Modules:
     transform: Data cleaning and transformation
     load: Data loading into MySQL database
     pipeline: ETL pipeline orchestration
+    staging: Parquet staging cache for parsed inputs
+    schema: Per-source schema registry
+    manifest: Source change detection
+    compression: Streaming decompression of compressed inputs
+    validation: Declarative row-level validation rules
+    profiling: Approximate data profiling
+    dedup: Persistent duplicate-key index across chunks and runs
 """
 
 __version__ = '1.0.0'
 __author__ = 'Your Name'
 
 from .extract import DataExtractor, extract_sales_data
-from .transform import (DataTransformer, transform_sales_data, 
-                       transform_customer_data, transform_product_data,
-                       transform_sales_rep_data)
-from .load import DataLoader, load_dimension_tables, load_fact_sales
+from .transform import DataTransformer, TransformPlan, transform_sales_data
+from .load import SurrogateKeyResolver
 from .pipeline import ETLPipeline, run_pipeline
+from .staging import StagingCache
+from .schema import SchemaRegistry
+from .manifest import SourceManifest
+from .validation import ValidationEngine
 
 __all__ = [
     'DataExtractor',
     'extract_sales_data',
     'DataTransformer',
+    'TransformPlan',
     'transform_sales_data',
-    'transform_customer_data',
-    'transform_product_data',
-    'transform_sales_rep_data',
-    'DataLoader',
-    'load_dimension_tables',
-    'load_fact_sales',
+    'SurrogateKeyResolver',
     'ETLPipeline',
-    'run_pipeline'
+    'run_pipeline',
+    'StagingCache',
+    'SchemaRegistry',
+    'SourceManifest',
+    'ValidationEngine'
 ]
\ No newline at end of file
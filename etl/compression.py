@@ -0,0 +1,298 @@
+"""
+Compression Module
+Detects compressed inputs and decompresses them in a streaming way
+"""
+
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes identifying each supported compression format
+MAGIC_NUMBERS = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd'
+}
+
+# Decompressed bytes handed from the decompression thread per block
+BLOCK_SIZE = 1024 * 1024
+
+# Blocks buffered ahead of the parser
+MAX_PENDING_BLOCKS = 8
+
+# zstd frame magic number, and the range reserved for skippable frames
+ZSTD_MAGIC = 0xFD2FB528
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+
+# Threads decompressing the frames of a multi-frame zstd file
+ZSTD_FRAME_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def detect_compression(filepath):
+    """
+    Detect the compression format of a file from its magic number
+    
+    Args:
+        filepath: Path to file
+    
+    Returns:
+        One of 'gzip', 'bz2', 'xz', 'zstd', or None if uncompressed
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(6)
+    
+    for magic, compression in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def zstd_frames(filepath):
+    """
+    Locate the frames of a zstd file without decompressing them
+    
+    Frame headers and the 3-byte block headers after them carry every size
+    needed to step from one frame to the next. Skippable frames are left out.
+    
+    Args:
+        filepath: Path to zstd file
+    
+    Returns:
+        List of (offset, length) tuples, one per data frame
+    """
+    frames = []
+    with open(filepath, 'rb') as f:
+        size = f.seek(0, io.SEEK_END)
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            header = f.read(5)
+            if len(header) < 5:
+                raise ValueError(f"Truncated zstd frame at byte {offset} of {filepath}")
+            magic = int.from_bytes(header[:4], 'little')
+            if magic & 0xFFFFFFF0 == ZSTD_SKIPPABLE_MAGIC:
+                offset += 8 + int.from_bytes(header[4:] + f.read(3), 'little')
+                continue
+            if magic != ZSTD_MAGIC:
+                raise ValueError(f"No zstd frame at byte {offset} of {filepath}")
+            
+            descriptor = header[4]
+            single_segment = descriptor >> 5 & 1
+            content_size_bytes = (single_segment, 2, 4, 8)[descriptor >> 6]
+            dictionary_id_bytes = (0, 1, 2, 4)[descriptor & 3]
+            position = offset + 5 + (1 - single_segment) + dictionary_id_bytes + content_size_bytes
+            
+            last = False
+            while not last:
+                f.seek(position)
+                block_header = f.read(3)
+                if len(block_header) < 3:
+                    raise ValueError(f"Truncated zstd frame at byte {offset} of {filepath}")
+                block_header = int.from_bytes(block_header, 'little')
+                last = block_header & 1
+                # RLE blocks (type 1) store a single byte whatever their size
+                block_type = block_header >> 1 & 3
+                position += 3 + (1 if block_type == 1 else block_header >> 3)
+            if descriptor >> 2 & 1:
+                position += 4  # content checksum
+            
+            frames.append((offset, position - offset))
+            offset = position
+    return frames
+
+
+class _ZstdFrameReader:
+    """Decompresses zstd frames on a thread pool and reads them back in order"""
+    
+    def __init__(self, filepath, frames, max_workers=ZSTD_FRAME_WORKERS):
+        self._file = open(filepath, 'rb')
+        self._frames = iter(frames)
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._pending = deque()
+        self._lookahead = max_workers * 2
+        self._buffer = memoryview(b'')
+        self._submit()
+    
+    @staticmethod
+    def _decompress(data):
+        # Decompression contexts are not thread-safe, so each frame gets its own
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    
+    def _submit(self):
+        while len(self._pending) < self._lookahead:
+            frame = next(self._frames, None)
+            if frame is None:
+                return
+            offset, length = frame
+            self._file.seek(offset)
+            self._pending.append(self._executor.submit(self._decompress, self._file.read(length)))
+    
+    def read(self, size=-1):
+        while not self._buffer:
+            if not self._pending:
+                return b''
+            self._buffer = memoryview(self._pending.popleft().result())
+            self._submit()
+        
+        if size is None or size < 0:
+            size = len(self._buffer)
+        block = self._buffer[:size].tobytes()
+        self._buffer = self._buffer[size:]
+        return block
+    
+    def close(self):
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        self._file.close()
+
+
+def _open_stream(filepath, compression):
+    """Open a decompressing stream; multi-member and multi-frame files are read through"""
+    if compression == 'gzip':
+        return gzip.open(filepath, 'rb')
+    if compression == 'bz2':
+        return bz2.open(filepath, 'rb')
+    if compression == 'xz':
+        return lzma.open(filepath, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst inputs")
+        try:
+            frames = zstd_frames(filepath)
+        except ValueError as e:
+            # Leave malformed input for the decompressor to report
+            logger.warning(f"Could not locate zstd frames: {str(e)}")
+            frames = []
+        if len(frames) > 1:
+            logger.info(f"Decompressing {len(frames)} zstd frames on {ZSTD_FRAME_WORKERS} threads")
+            return _ZstdFrameReader(filepath, frames)
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(filepath, 'rb'), read_across_frames=True, closefd=True
+        )
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """
+    Read-only stream that decompresses on a background thread
+    
+    Decompression runs ahead of the consumer into a bounded queue of blocks,
+    so it overlaps with CSV parsing on another core instead of alternating
+    with it, and nothing is written to disk.
+    
+    gzip, bz2 and xz members can only be found by inflating them, so those
+    streams are inflated by this one thread. The frames of a multi-frame
+    .zst file (as written by pzstd) are located from their headers and
+    decompressed on a small pool instead; see zstd_frames.
+    """
+    
+    def __init__(self, stream, block_size=BLOCK_SIZE, max_pending=MAX_PENDING_BLOCKS):
+        super().__init__()
+        self._stream = stream
+        self._block_size = block_size
+        self._blocks = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._buffer = memoryview(b'')
+        self._error = None
+        self._eof = False
+        
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+    
+    def _produce(self):
+        try:
+            while not self._stop.is_set():
+                block = self._stream.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._error = e
+            self._put(b'')
+    
+    def _put(self, block):
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(block, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, b):
+        if not self._buffer and not self._eof:
+            block = self._blocks.get()
+            if self._error is not None:
+                raise self._error
+            if not block:
+                self._eof = True
+            self._buffer = memoryview(block)
+        
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+    
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+def open_decompressed(filepath, compression=None):
+    """
+    Open a compressed file as a buffered stream of decompressed bytes
+    
+    Args:
+        filepath: Path to compressed file
+        compression: Compression format (detected from the file if None)
+    
+    Returns:
+        Binary file object yielding decompressed data
+    """
+    compression = compression or detect_compression(filepath)
+    logger.info(f"Decompressing {filepath} ({compression}) on a background thread")
+    return io.BufferedReader(ThreadedDecompressor(_open_stream(filepath, compression)))
+
+
+@contextmanager
+def open_source(filepath):
+    """
+    Open a CSV or JSON Lines source, decompressing it if needed
+    
+    Compressed files (gzip, bz2, xz, zstd) are detected by magic number and
+    streamed straight into the parser rather than decompressed to disk.
+    
+    Args:
+        filepath: Path to source file
+        
+    Yields:
+        The path itself for plain files, or a decompressed binary stream
+    """
+    if detect_compression(filepath) is None:
+        yield filepath
+        return
+    
+    with open_decompressed(filepath) as source:
+        yield source
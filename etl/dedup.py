@@ -0,0 +1,195 @@
+"""
+Deduplication Module
+Persistent duplicate-key index shared across chunks and pipeline runs
+"""
+
+import logging
+import math
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Keys the Bloom filter is sized for before its false positive rate degrades
+DEFAULT_CAPACITY = 10_000_000
+
+# Target Bloom filter false positive rate at capacity
+DEFAULT_ERROR_RATE = 0.01
+
+# Keys per exact-store lookup, kept under SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Separator joining the values of multi-column keys
+KEY_SEPARATOR = '\x1f'
+
+# Second hash key for double hashing (pandas requires 16 characters)
+BLOOM_HASH_KEY = 'dedup-bloom-seed'
+
+
+def _key_strings(df, subset):
+    """Render key columns as one string per row"""
+    keys = df[subset[0]].astype(str)
+    for column in subset[1:]:
+        keys = keys + KEY_SEPARATOR + df[column].astype(str)
+    return keys
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter probed with vectorized double hashing
+    
+    Never reports a present key as absent; absent keys are reported present
+    with probability error_rate while at most capacity keys are stored.
+    """
+    
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = np.uint64(-(-bits // 8) * 8)
+        self.num_hashes = max(1, round(bits / capacity * math.log(2)))
+        self.bits = np.zeros(int(self.num_bits) // 8, dtype=np.uint8)
+    
+    def _positions(self, keys):
+        h1 = pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+        h2 = pd.util.hash_pandas_object(keys, index=False, hash_key=BLOOM_HASH_KEY)
+        h2 = h2.to_numpy(dtype=np.uint64)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * (h2[:, None] | np.uint64(1))) % self.num_bits
+    
+    def contains(self, keys):
+        """
+        Probe the filter for each key
+        
+        Args:
+            keys: Series of key strings
+        
+        Returns:
+            Boolean array, True where the key may have been added
+        """
+        positions = self._positions(keys)
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        hits = (self.bits[positions >> np.uint64(3)] & masks) != 0
+        return hits.all(axis=1)
+    
+    def add(self, keys):
+        """Add a Series of key strings to the filter"""
+        positions = self._positions(keys).ravel()
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+
+
+class DedupIndex:
+    """
+    Persistent set of keys already passed downstream
+    
+    A Bloom filter answers "definitely new" for most keys without touching
+    disk; only its positives are confirmed against an exact SQLite key store.
+    Keys seen by filter() are staged and only persisted by commit(), so a
+    failed run re-processes the same rows next time.
+    """
+    
+    def __init__(self, index_dir='data/processed/dedup', capacity=DEFAULT_CAPACITY,
+                 error_rate=DEFAULT_ERROR_RATE):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.bloom_path = self.index_dir / 'bloom.npy'
+        self.pending = set()
+        
+        self.connection = sqlite3.connect(self.index_dir / 'keys.db')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        
+        self.bloom = BloomFilter(capacity, error_rate)
+        bits = np.load(self.bloom_path) if self.bloom_path.exists() else None
+        if bits is not None and len(bits) == len(self.bloom.bits):
+            self.bloom.bits = bits
+        else:
+            self._rebuild_bloom()
+    
+    def _rebuild_bloom(self):
+        """Re-derive the Bloom filter from the exact key store"""
+        cursor = self.connection.execute('SELECT key FROM seen_keys')
+        total = 0
+        while True:
+            rows = cursor.fetchmany(LOOKUP_BATCH_SIZE * 100)
+            if not rows:
+                break
+            self.bloom.add(pd.Series([row[0] for row in rows], dtype=object))
+            total += len(rows)
+        if total:
+            logger.info(f"Rebuilt dedup Bloom filter from {total} stored keys")
+    
+    def _stored(self, keys):
+        """Return the subset of keys present in the exact key store"""
+        found = set()
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f'SELECT key FROM seen_keys WHERE key IN ({placeholders})', batch
+            )
+            found.update(row[0] for row in rows)
+        return found
+    
+    def filter(self, df, subset):
+        """
+        Drop rows whose key was seen in this chunk, an earlier chunk or a committed run
+        
+        Rows with a null key are passed through and not recorded.
+        
+        Args:
+            df: DataFrame to deduplicate
+            subset: List of key columns
+        
+        Returns:
+            DataFrame with only the first occurrence of each new key
+        """
+        if df.empty:
+            return df
+        
+        valid = df[subset].notna().all(axis=1).to_numpy()
+        keys = _key_strings(df, subset)
+        duplicate = keys.duplicated().to_numpy() & valid
+        
+        # Only Bloom positives need an exact check
+        candidates = valid & ~duplicate & self.bloom.contains(keys)
+        if candidates.any():
+            candidate_keys = keys[candidates]
+            # Probe the staged set key by key: isin() would copy the whole
+            # set, which grows with every chunk of the run
+            seen = np.fromiter((key in self.pending for key in candidate_keys),
+                               dtype=bool, count=len(candidate_keys))
+            # Only keys not staged this run need the exact store
+            if not seen.all():
+                unstaged = candidate_keys[~seen]
+                seen[~seen] = unstaged.isin(self._stored(list(unstaged))).to_numpy()
+            duplicate[candidates] = seen
+        
+        new_keys = keys[valid & ~duplicate]
+        self.bloom.add(new_keys)
+        self.pending.update(new_keys)
+        
+        if duplicate.any():
+            logger.info(f"Dropped {int(duplicate.sum())} previously seen keys")
+        return df[~duplicate]
+    
+    def commit(self):
+        """Persist keys staged since the last commit"""
+        if not self.pending:
+            return
+        
+        # The Bloom filter is written first: extra bits only cost false
+        # positives, while a stale filter would hide stored keys
+        tmp_path = self.bloom_path.with_name('bloom.tmp.npy')
+        np.save(tmp_path, self.bloom.bits)
+        os.replace(tmp_path, self.bloom_path)
+        
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO seen_keys (key) VALUES (?)',
+                ((key,) for key in self.pending)
+            )
+        logger.info(f"Dedup index committed {len(self.pending)} keys")
+        self.pending = set()
@@ -4,10 +4,36 @@ Extracts data from various sources (CSV, Excel, APIs)
 """
 
 import pandas as pd
+import openpyxl
+import re
+import requests
+from sqlalchemy import create_engine, text
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import io
+import json
+import hashlib
 import logging
+import time
+import operator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date
+
+from etl.compression import open_source
+from etl.manifest import write_json_atomic
+from etl.profiling import approximate_profile, DEFAULT_SAMPLE_SIZE
+from etl.schema import SchemaRegistry, SchemaDriftError, PYARROW_AVAILABLE
+from etl.staging import StagingCache, DEFAULT_MAX_BYTES
+from etl.validation import ValidationEngine
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
 
 # Configure logging
 logging.basicConfig(
@@ -16,20 +42,212 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Source files read by extract_sales_data, keyed by dataset name
+SOURCE_FILES = {
+    'sales': 'sales_transactions.csv',
+    'customers': 'customers.csv',
+    'products': 'products.csv',
+    'sales_reps': 'sales_reps.csv'
+}
+
+# HTTP statuses retried with backoff by extract_api
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Committed byte offsets for append-only tail extraction
+TAIL_STATE_PATH = 'data/processed/tail_state.json'
+
+# Committed high-water marks for incremental SQL extraction
+WATERMARK_STATE_PATH = 'data/processed/watermarks.json'
+
+# Bytes before the committed offset hashed to detect rewritten files
+TAIL_GUARD_BYTES = 4096
+
+# Default rows per chunk for streaming extraction
+DEFAULT_CHUNKSIZE = 100_000
+
+# Rows parsed to estimate the in-memory size of a row for byte-budgeted chunks
+CHUNK_SAMPLE_ROWS = 1_000
+
+
+# Row predicate operators, matching the pyarrow filter syntax
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda series, value: series.isin(value),
+    'not in': lambda series, value: ~series.isin(value)
+}
+
+
+def apply_filters(df, filters):
+    """
+    Keep only rows matching every (column, op, value) filter
+    
+    Date-valued filters compare against the column parsed as datetimes, so
+    order-date ranges work whether or not the column was parsed as dates.
+    
+    Args:
+        df: DataFrame to filter
+        filters: List of (column, op, value) tuples
+        
+    Returns:
+        Filtered DataFrame
+    """
+    if not filters:
+        return df
+    
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        series = df[column]
+        if isinstance(value, date):
+            value = pd.Timestamp(value)
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, errors='coerce')
+        mask &= FILTER_OPERATORS[op](series, value)
+    
+    return df[mask]
+
+
+def _read_columns(columns, filters):
+    """Columns that must be decoded to apply a projection and its filters"""
+    if columns is None:
+        return None
+    read_columns = list(columns)
+    for column, _, _ in filters or []:
+        if column not in read_columns:
+            read_columns.append(column)
+    return read_columns
+
+
+def _project(df, columns, filters):
+    """Apply row filters, then drop columns outside the projection"""
+    df = apply_filters(df, filters)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def _read_csv_timed(filepath, kwargs):
+    """
+    Parse a CSV file and measure how long it took
+    
+    Defined at module level so it can be pickled into worker processes.
+    
+    Args:
+        filepath: Path to CSV file
+        kwargs: Additional arguments for pd.read_csv
+        
+    Returns:
+        Tuple of (DataFrame, parse time in seconds)
+    """
+    start = time.perf_counter()
+    with open_source(filepath) as source:
+        df = pd.read_csv(source, **kwargs)
+    return df, time.perf_counter() - start
+
+
+def _iter_excel_batches(filepath, sheet_name=0, batch_size=DEFAULT_CHUNKSIZE):
+    """
+    Stream rows from an Excel sheet in read-only mode
+    
+    openpyxl's read-only mode parses the sheet XML lazily, so only one
+    batch of rows is materialized at a time.
+    
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Sheet name or index
+        batch_size: Maximum number of rows per batch
+        
+    Yields:
+        DataFrame batches using the first row as column names
+    """
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        if isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+        
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame.from_records(batch, columns=header)
+                batch = []
+        
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _read_excel_sheet(filepath, sheet_name):
+    """
+    Read a whole Excel sheet through the streaming reader
+    
+    Defined at module level so it can be pickled into worker processes.
+    
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Sheet name or index
+        
+    Returns:
+        DataFrame with the sheet contents
+    """
+    batches = list(_iter_excel_batches(filepath, sheet_name))
+    if not batches:
+        return pd.DataFrame()
+    return pd.concat(batches, ignore_index=True)
+
+
+def _row_hash(row):
+    """
+    Hash a database row by its raw driver values
+    
+    The dtypes pandas infers change with the NULLs a batch happens to
+    contain; the driver values do not.
+    """
+    return hashlib.sha256(repr(tuple(row)).encode()).hexdigest()[:16]
+
 
 class DataExtractor:
     """Handles data extraction from various sources"""
     
-    def __init__(self, data_path='data/raw'):
+    def __init__(self, data_path='data/raw', cache_dir=None,
+                 cache_max_bytes=DEFAULT_MAX_BYTES, use_schema=False):
         self.data_path = Path(data_path)
         self.data_path.mkdir(parents=True, exist_ok=True)
         
-    def extract_csv(self, filename, **kwargs):
+        # Optional Parquet staging cache for parsed CSVs
+        self.cache = StagingCache(cache_dir, cache_max_bytes) if cache_dir else None
+        
+        # Optional registry of learned per-source dtypes
+        self.schemas = SchemaRegistry() if use_schema else None
+        
+    def extract_csv(self, filename, columns=None, filters=None, **kwargs):
         """
         Extract data from CSV file
         
+        Compressed files are detected automatically and decompressed on a
+        background thread while they are parsed. A column projection is
+        pushed into the reader so unused columns are never decoded. Row
+        filters are applied chunk by chunk while reading, or pushed into the
+        Parquet read when the staging cache holds the file.
+        
         Args:
             filename: Name of CSV file
+            columns: Optional list of columns to keep
+            filters: Optional list of (column, op, value) row filters, e.g.
+                [('order_date', '>=', date(2024, 1, 1))]
             **kwargs: Additional arguments for pd.read_csv
             
         Returns:
@@ -39,7 +257,30 @@ class DataExtractor:
             filepath = self.data_path / filename
             logger.info(f"Extracting data from {filepath}")
             
-            df = pd.read_csv(filepath, **kwargs)
+            kwargs = self._schema_options(filepath, kwargs, allow_pyarrow=True)
+            read_columns = _read_columns(columns, filters)
+            
+            if self.cache is not None:
+                # Cache entries hold the full parse so any projection can reuse them
+                cache_key = self.cache.key(filepath, kwargs)
+                df = self.cache.get(cache_key, columns=read_columns, filters=filters)
+                if df is None:
+                    with open_source(filepath) as source:
+                        df = pd.read_csv(source, **kwargs)
+                    self.cache.put(cache_key, df)
+                df = _project(df, columns, filters)
+            elif filters:
+                kwargs.pop('engine', None)
+                options = self._projection_options(kwargs, read_columns)
+                with open_source(filepath) as source, \
+                        pd.read_csv(source, chunksize=DEFAULT_CHUNKSIZE, **options) as reader:
+                    df = pd.concat(
+                        [_project(chunk, columns, filters) for chunk in reader],
+                        ignore_index=True
+                    )
+            else:
+                with open_source(filepath) as source:
+                    df = pd.read_csv(source, **self._projection_options(kwargs, read_columns))
             logger.info(f"Successfully extracted {len(df)} records from {filename}")
             
             return df
@@ -51,6 +292,411 @@ class DataExtractor:
             logger.error(f"Error extracting CSV {filename}: {str(e)}")
             raise
     
+    def extract_csv_chunks(self, filename, chunksize=None, chunk_bytes=None,
+                           columns=None, filters=None, **kwargs):
+        """
+        Extract data from CSV file as a stream of bounded-size chunks
+        
+        Only one chunk is held in memory at a time, so peak memory stays
+        flat regardless of the file size.
+        
+        Args:
+            filename: Name of CSV file
+            chunksize: Maximum number of rows per chunk
+            chunk_bytes: Approximate in-memory size budget per chunk, used
+                to derive the row count when chunksize is not given
+            columns: Optional list of columns to keep
+            filters: Optional list of (column, op, value) row filters
+            **kwargs: Additional arguments for pd.read_csv
+            
+        Yields:
+            DataFrame chunks with extracted data
+        """
+        filepath = self.data_path / filename
+        
+        try:
+            if chunksize is None:
+                if chunk_bytes:
+                    chunksize = self._rows_per_chunk(filepath, chunk_bytes, **kwargs)
+                else:
+                    chunksize = DEFAULT_CHUNKSIZE
+            
+            logger.info(f"Streaming data from {filepath} in chunks of {chunksize} rows")
+            
+            kwargs = self._schema_options(filepath, kwargs)
+            kwargs = self._projection_options(kwargs, _read_columns(columns, filters))
+            
+            total_records = 0
+            with open_source(filepath) as source, \
+                    pd.read_csv(source, chunksize=chunksize, **kwargs) as reader:
+                for chunk in reader:
+                    chunk = _project(chunk, columns, filters)
+                    total_records += len(chunk)
+                    yield chunk
+            
+            logger.info(f"Successfully streamed {total_records} records from {filename}")
+            
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming CSV {filename}: {str(e)}")
+            raise
+    
+    def extract_csv_tail(self, filename, state_path=TAIL_STATE_PATH, **kwargs):
+        """
+        Extract only the rows appended to a CSV file since the last commit
+        
+        The committed state holds the byte offset reached by the previous
+        run, a hash of the header line and a hash of the bytes just before
+        the offset. If the header or those bytes changed, or the file shrank,
+        the file was rewritten rather than appended to and is read in full.
+        A trailing partial line is left for the next run.
+        
+        Args:
+            filename: Name of CSV file
+            state_path: Path of the JSON file holding committed offsets
+            **kwargs: Additional arguments for pd.read_csv
+            
+        Returns:
+            Tuple of (DataFrame with new rows, checkpoint to pass to
+            commit_tail once the rows are loaded)
+        """
+        filepath = self.data_path / filename
+        
+        try:
+            key = str(filepath.resolve())
+            state = self._load_state(state_path)
+            previous = state.get(key)
+            
+            with open(filepath, 'rb') as f:
+                header = f.readline()
+                header_hash = hashlib.sha256(header).hexdigest()
+                size = os.fstat(f.fileno()).st_size
+                
+                start = len(header)
+                if (previous and previous['header_sha256'] == header_hash
+                        and previous['offset'] <= size
+                        and self._tail_guard(f, previous['offset'], len(header)) == previous['guard_sha256']):
+                    start = previous['offset']
+                elif previous:
+                    logger.warning(f"{filename} was rewritten, re-reading from the start")
+                
+                f.seek(start)
+                delta = f.read()
+                delta = delta[:delta.rfind(b'\n') + 1]
+                offset = start + len(delta)
+                guard_hash = self._tail_guard(f, offset, len(header))
+            
+            logger.info(f"Extracting {len(delta)} appended bytes from {filepath} at offset {start}")
+            
+            if delta:
+                df = pd.read_csv(io.BytesIO(header + delta), **kwargs)
+            else:
+                df = pd.read_csv(io.BytesIO(header), **kwargs)
+            logger.info(f"Successfully extracted {len(df)} new records from {filename}")
+            
+            checkpoint = {
+                'path': key,
+                'offset': offset,
+                'header_sha256': header_hash,
+                'guard_sha256': guard_hash
+            }
+            return df, checkpoint
+            
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting CSV tail {filename}: {str(e)}")
+            raise
+    
+    def commit_tail(self, checkpoint, state_path=TAIL_STATE_PATH):
+        """
+        Record a tail extraction checkpoint as committed
+        
+        Args:
+            checkpoint: Checkpoint returned by extract_csv_tail
+            state_path: Path of the JSON file holding committed offsets
+        """
+        state = self._load_state(state_path)
+        state[checkpoint['path']] = checkpoint
+        write_json_atomic(state_path, state)
+        logger.info(f"Committed tail offset {checkpoint['offset']} for {checkpoint['path']}")
+    
+    @staticmethod
+    def _load_state(state_path):
+        """Load a JSON state file, or an empty state if it does not exist yet"""
+        if not Path(state_path).exists():
+            return {}
+        with open(state_path) as f:
+            return json.load(f)
+    
+    @staticmethod
+    def _tail_guard(f, offset, header_length):
+        """Hash the bytes just before an offset to detect rewritten files"""
+        start = max(header_length, offset - TAIL_GUARD_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+    
+    def extract_sql_incremental(self, engine, table, watermark_column='updated_at',
+                                columns=None, batch_size=DEFAULT_CHUNKSIZE,
+                                checkpoint=None, state_path=WATERMARK_STATE_PATH):
+        """
+        Extract rows changed since the committed high-water mark of a table
+        
+        Rows are read in watermark order through a server-side cursor and
+        yielded in fixed-size batches, so memory stays bounded however many
+        rows changed. The new watermark is written into checkpoint as batches
+        are consumed; pass it to commit_watermark once the rows are loaded.
+        
+        Rows at the watermark itself are read again, since rows committed
+        later can share its timestamp; those already extracted are recognized
+        by the row hashes kept alongside the watermark and dropped.
+        
+        Args:
+            engine: SQLAlchemy engine or database URL
+            table: Source table name
+            watermark_column: Monotonic change-tracking column
+            columns: Optional list of columns to select (all if None)
+            batch_size: Rows per batch
+            checkpoint: Dictionary updated with the table and new watermark
+            state_path: Path of the JSON file holding committed watermarks
+            
+        Yields:
+            DataFrame batches with changed rows
+        """
+        identifiers = [table, watermark_column] + list(columns or [])
+        invalid = [name for name in identifiers if not re.fullmatch(r'\w+', name)]
+        if invalid:
+            raise ValueError(f"Invalid SQL identifiers: {invalid}")
+        
+        if isinstance(engine, str):
+            engine = create_engine(engine)
+        if checkpoint is None:
+            checkpoint = {}
+        
+        state = self._load_state(state_path).get(table, {})
+        watermark = state.get('watermark')
+        seen = set(state.get('boundary', []))
+        checkpoint.update({'table': table, 'watermark': watermark, 'boundary': list(seen)})
+        
+        select_list = ', '.join(columns) if columns else '*'
+        query = f"SELECT {select_list} FROM {table}"
+        params = {}
+        if watermark is not None:
+            query += f" WHERE {watermark_column} >= :watermark"
+            params['watermark'] = watermark
+        query += f" ORDER BY {watermark_column}"
+        
+        try:
+            logger.info(f"Extracting {table} rows with {watermark_column} >= {watermark}")
+            
+            total_records = 0
+            with engine.connect() as connection:
+                result = connection.execution_options(
+                    stream_results=True, yield_per=batch_size
+                ).execute(text(query), params)
+                
+                for rows in result.partitions(batch_size):
+                    batch = pd.DataFrame(rows, columns=list(result.keys()))
+                    marks = batch[watermark_column].astype(str)
+                    
+                    # Drop boundary rows a committed run already extracted;
+                    # rows come in watermark order, so they lead the batch
+                    if seen and marks.iloc[0] == watermark:
+                        new = [mark != watermark or _row_hash(row) not in seen
+                               for mark, row in zip(marks, rows)]
+                        batch, marks = batch[new], marks[new]
+                        rows = [row for row, keep in zip(rows, new) if keep]
+                        if batch.empty:
+                            continue
+                    
+                    last = marks.iloc[-1]
+                    if last != checkpoint['watermark']:
+                        checkpoint['boundary'] = []
+                    checkpoint['watermark'] = last
+                    checkpoint['boundary'].extend(
+                        _row_hash(row) for mark, row in zip(marks, rows) if mark == last
+                    )
+                    
+                    total_records += len(batch)
+                    yield batch
+            
+            logger.info(f"Successfully extracted {total_records} changed records from {table}")
+            
+        except Exception as e:
+            logger.error(f"Error extracting {table} incrementally: {str(e)}")
+            raise
+    
+    def commit_watermark(self, checkpoint, state_path=WATERMARK_STATE_PATH):
+        """
+        Record the high-water mark reached by extract_sql_incremental
+        
+        The state file is replaced atomically, so a crash leaves either the
+        old or the new watermark, never a partial file.
+        
+        Args:
+            checkpoint: Checkpoint filled in by extract_sql_incremental
+            state_path: Path of the JSON file holding committed watermarks
+        """
+        if checkpoint.get('watermark') is None:
+            return
+        
+        state = self._load_state(state_path)
+        state[checkpoint['table']] = {
+            'watermark': checkpoint['watermark'],
+            'boundary': checkpoint.get('boundary', [])
+        }
+        write_json_atomic(state_path, state)
+        logger.info(f"Committed watermark {checkpoint['watermark']} for {checkpoint['table']}")
+    
+    def _schema_options(self, filepath, kwargs, allow_pyarrow=False):
+        """
+        Merge registered schema dtypes into pd.read_csv arguments
+        
+        Explicit caller arguments take precedence over the registry. The
+        pyarrow engine is only selected when the caller passed no options of
+        their own, since it supports a narrower set of read_csv arguments.
+        
+        Args:
+            filepath: Path to CSV file
+            kwargs: Caller-supplied arguments for pd.read_csv
+            allow_pyarrow: Whether the pyarrow parse engine may be used
+            
+        Returns:
+            Dictionary of arguments for pd.read_csv
+        """
+        if self.schemas is None:
+            return kwargs
+        
+        options = self.schemas.read_options(filepath)
+        if allow_pyarrow and PYARROW_AVAILABLE and not kwargs:
+            options['engine'] = 'pyarrow'
+        
+        options.update(kwargs)
+        return options
+    
+    @staticmethod
+    def _projection_options(kwargs, read_columns):
+        """
+        Restrict pd.read_csv arguments to the projected columns
+        
+        Args:
+            kwargs: Arguments for pd.read_csv
+            read_columns: Columns to decode, or None for all columns
+            
+        Returns:
+            Dictionary of arguments for pd.read_csv
+        """
+        if read_columns is None:
+            return kwargs
+        
+        options = dict(kwargs, usecols=read_columns)
+        if isinstance(options.get('parse_dates'), list):
+            options['parse_dates'] = [col for col in options['parse_dates'] if col in read_columns]
+        # The pyarrow engine rejects dtypes for columns it does not read
+        if isinstance(options.get('dtype'), dict):
+            options['dtype'] = {col: t for col, t in options['dtype'].items() if col in read_columns}
+        return options
+    
+    def _rows_per_chunk(self, filepath, chunk_bytes, **kwargs):
+        """
+        Estimate how many rows fit in a chunk of the given memory budget
+        
+        Args:
+            filepath: Path to CSV file
+            chunk_bytes: Target in-memory size per chunk
+            **kwargs: Additional arguments for pd.read_csv
+            
+        Returns:
+            Number of rows per chunk (at least 1)
+        """
+        with open_source(filepath) as source:
+            sample = pd.read_csv(source, nrows=CHUNK_SAMPLE_ROWS, **kwargs)
+        if sample.empty:
+            return DEFAULT_CHUNKSIZE
+        
+        bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+        return max(1, int(chunk_bytes // bytes_per_row))
+    
+    def extract_jsonl(self, filename, batch_size=DEFAULT_CHUNKSIZE, field_map=None, dtype=None):
+        """
+        Extract data from a JSON Lines (NDJSON) file as a stream of batches
+        
+        Lines are parsed with orjson when it is installed. Nested objects are
+        flattened into dotted column names ('customer.code'); field_map
+        selects and renames them. Compressed files are decompressed on the fly.
+        
+        Args:
+            filename: Name of JSON Lines file
+            batch_size: Maximum number of records per batch
+            field_map: Optional dictionary mapping output column to dotted
+                source path, e.g. {'customer_code': 'customer.code'}
+            dtype: Optional dtype mapping applied to each batch
+            
+        Yields:
+            DataFrame batches with extracted data
+        """
+        filepath = self.data_path / filename
+        paths = {column: tuple(path.split('.')) for column, path in (field_map or {}).items()}
+        
+        def lookup(records):
+            # Only the mapped paths are pulled out, one level at a time with
+            # shared prefixes walked once; flattening every field first
+            # dominates the cost of a batch
+            levels = {(): records}
+            columns = {}
+            for column, keys in paths.items():
+                for depth in range(1, len(keys) + 1):
+                    if keys[:depth] not in levels:
+                        key = keys[depth - 1]
+                        levels[keys[:depth]] = [
+                            value.get(key) if type(value) is dict else None
+                            for value in levels[keys[:depth - 1]]
+                        ]
+                columns[column] = levels[keys]
+            return pd.DataFrame(columns)
+        
+        def to_frame(records):
+            if paths:
+                df = lookup(records)
+            else:
+                df = pd.json_normalize(records, sep='.')
+            if dtype:
+                df = df.astype({col: t for col, t in dtype.items() if col in df})
+            return df
+        
+        try:
+            logger.info(f"Streaming data from {filepath} in batches of {batch_size} records")
+            
+            total_records = 0
+            with open_source(filepath) as source:
+                stream = open(source, 'rb') if isinstance(source, Path) else source
+                with stream:
+                    records = []
+                    for line in stream:
+                        if not line.strip():
+                            continue
+                        records.append(_json_loads(line))
+                        if len(records) >= batch_size:
+                            total_records += len(records)
+                            yield to_frame(records)
+                            records = []
+                    
+                    if records:
+                        total_records += len(records)
+                        yield to_frame(records)
+            
+            logger.info(f"Successfully streamed {total_records} records from {filename}")
+            
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming JSON Lines {filename}: {str(e)}")
+            raise
+    
     def extract_excel(self, filename, sheet_name=0, **kwargs):
         """
         Extract data from Excel file
@@ -79,40 +725,243 @@ class DataExtractor:
             logger.error(f"Error extracting Excel {filename}: {str(e)}")
             raise
     
-    def extract_multiple_csvs(self, pattern='*.csv'):
+    def extract_excel_batches(self, filename, sheet_name=0, batch_size=DEFAULT_CHUNKSIZE):
+        """
+        Extract data from an Excel sheet as a stream of row batches
+        
+        Args:
+            filename: Name of Excel file
+            sheet_name: Sheet name or index
+            batch_size: Maximum number of rows per batch
+            
+        Yields:
+            DataFrame batches with extracted data
+        """
+        filepath = self.data_path / filename
+        
+        try:
+            logger.info(f"Streaming data from {filepath}, sheet: {sheet_name}")
+            
+            total_records = 0
+            for batch in _iter_excel_batches(filepath, sheet_name, batch_size):
+                total_records += len(batch)
+                yield batch
+            
+            logger.info(f"Successfully streamed {total_records} records from {filename}")
+            
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming Excel {filename}: {str(e)}")
+            raise
+    
+    def extract_excel_sheets(self, filename, sheet_names=None, max_workers=None):
+        """
+        Extract several Excel sheets, in parallel and through the staging cache
+        
+        Sheets already converted to Parquet by an earlier run are read from
+        the staging cache; the rest are parsed across worker processes,
+        since openpyxl's XML parsing is CPU-bound Python code.
+        
+        Args:
+            filename: Name of Excel file
+            sheet_names: List of sheet names (all sheets if None)
+            max_workers: Number of worker processes (None or 1 parses
+                sequentially in this process)
+            
+        Returns:
+            Dictionary of DataFrames keyed by sheet name
+        """
+        filepath = self.data_path / filename
+        
+        try:
+            if sheet_names is None:
+                workbook = openpyxl.load_workbook(filepath, read_only=True)
+                sheet_names = workbook.sheetnames
+                workbook.close()
+            
+            sheets = {}
+            cache_keys = {}
+            if self.cache is not None:
+                for sheet_name in sheet_names:
+                    cache_keys[sheet_name] = self.cache.key(filepath, {'sheet': sheet_name})
+                    cached = self.cache.get(cache_keys[sheet_name])
+                    if cached is not None:
+                        sheets[sheet_name] = cached
+            
+            pending = [name for name in sheet_names if name not in sheets]
+            logger.info(f"Extracting {len(pending)} sheets from {filepath} "
+                        f"({len(sheets)} from staging cache)")
+            
+            if max_workers and max_workers > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(
+                        _read_excel_sheet, [filepath] * len(pending), pending
+                    ))
+            else:
+                results = [_read_excel_sheet(filepath, name) for name in pending]
+            
+            for sheet_name, df in zip(pending, results):
+                sheets[sheet_name] = df
+                if self.cache is not None:
+                    self.cache.put(cache_keys[sheet_name], df)
+            
+            logger.info(f"Successfully extracted {len(sheets)} sheets from {filename}")
+            return {name: sheets[name] for name in sheet_names}
+            
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting Excel sheets from {filename}: {str(e)}")
+            raise
+    
+    def extract_api(self, url, params=None, records_key='data', page_param='page',
+                    page_size=None, page_size_param='page_size', start_page=1,
+                    max_in_flight=4, max_retries=3, backoff_factor=0.5,
+                    timeout=30, dtype=None):
+        """
+        Extract paginated JSON records from an HTTP API
+        
+        Pages are fetched concurrently over a pooled session with at most
+        max_in_flight requests outstanding, and yielded in page order. Paging
+        stops at the first empty page, or at a short page when page_size is
+        known. Failed requests are retried with exponential backoff.
+        
+        Args:
+            url: Endpoint URL
+            params: Additional query parameters sent with every request
+            records_key: Key of the record list in each JSON response
+                (None if the response body is the list itself)
+            page_param: Query parameter carrying the page number
+            page_size: Records requested per page
+            page_size_param: Query parameter carrying the page size
+            start_page: Number of the first page
+            max_in_flight: Maximum number of concurrent requests
+            max_retries: Retries per request on connection errors and
+                retryable statuses
+            backoff_factor: Base delay for exponential backoff between retries
+            timeout: Request timeout in seconds
+            dtype: Optional dtype mapping applied to each batch
+            
+        Yields:
+            DataFrame batches, one per page
+        """
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor,
+                      status_forcelist=RETRY_STATUSES, allowed_methods=['GET'])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight, max_retries=retry)
+        
+        def fetch(session, page):
+            query = dict(params or {}, **{page_param: page})
+            if page_size:
+                query[page_size_param] = page_size
+            response = session.get(url, params=query, timeout=timeout)
+            response.raise_for_status()
+            payload = response.json()
+            return payload[records_key] if records_key else payload
+        
+        try:
+            logger.info(f"Extracting data from {url} with {max_in_flight} requests in flight")
+            
+            total_records = 0
+            with requests.Session() as session, \
+                    ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                
+                next_page = start_page
+                in_flight = deque()
+                for _ in range(max_in_flight):
+                    in_flight.append(executor.submit(fetch, session, next_page))
+                    next_page += 1
+                
+                while in_flight:
+                    records = in_flight.popleft().result()
+                    if not records:
+                        break
+                    
+                    batch = pd.DataFrame.from_records(records)
+                    if dtype:
+                        batch = batch.astype({col: t for col, t in dtype.items() if col in batch})
+                    total_records += len(batch)
+                    yield batch
+                    
+                    if page_size and len(records) < page_size:
+                        break
+                    in_flight.append(executor.submit(fetch, session, next_page))
+                    next_page += 1
+                
+                # Pages requested past the end are discarded
+                for future in in_flight:
+                    future.cancel()
+            
+            logger.info(f"Successfully extracted {total_records} records from {url}")
+            
+        except Exception as e:
+            logger.error(f"Error extracting API {url}: {str(e)}")
+            raise
+    
+    def extract_multiple_csvs(self, pattern='*.csv', max_workers=None,
+                              return_metadata=False, **kwargs):
         """
         Extract data from multiple CSV files matching a pattern
         
         Args:
             pattern: File pattern to match
+            max_workers: Number of worker processes used to parse files in
+                parallel (None or 1 parses sequentially in this process)
+            return_metadata: Also return per-file parse statistics
+            **kwargs: Additional arguments for pd.read_csv
             
         Returns:
-            Dictionary of DataFrames
+            Dictionary of DataFrames keyed by filename in sorted order, or a
+            tuple of (DataFrames, metadata) if return_metadata is set
         """
         data_dict = {}
+        metadata = {}
         
         try:
-            files = list(self.data_path.glob(pattern))
+            # Sort so results are merged in a deterministic order
+            files = sorted(self.data_path.glob(pattern))
             logger.info(f"Found {len(files)} files matching pattern: {pattern}")
             
-            for filepath in files:
+            if max_workers and max_workers > 1 and len(files) > 1:
+                logger.info(f"Parsing files with {max_workers} worker processes")
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(
+                        _read_csv_timed, files, [kwargs] * len(files)
+                    ))
+            else:
+                results = [_read_csv_timed(filepath, kwargs) for filepath in files]
+            
+            for filepath, (df, seconds) in zip(files, results):
                 filename = filepath.name
-                data_dict[filename] = pd.read_csv(filepath)
-                logger.info(f"Extracted {len(data_dict[filename])} records from {filename}")
+                data_dict[filename] = df
+                metadata[filename] = {
+                    'rows': len(df),
+                    'parse_seconds': seconds,
+                    'rows_per_second': len(df) / seconds if seconds > 0 else None
+                }
+                logger.info(f"Extracted {len(df)} records from {filename} in {seconds:.3f}s")
             
+            if return_metadata:
+                return data_dict, metadata
             return data_dict
             
         except Exception as e:
             logger.error(f"Error extracting multiple CSVs: {str(e)}")
             raise
     
-    def validate_data(self, df, required_columns=None):
+    def validate_data(self, df, required_columns=None, rules=None):
         """
         Validate extracted data
         
         Args:
             df: DataFrame to validate
             required_columns: List of required column names
+            rules: Optional list of row-level validation rules (see
+                etl.validation); any rejected row fails validation
             
         Returns:
             Boolean indicating validation success
@@ -127,19 +976,49 @@ class DataExtractor:
                 logger.error(f"Missing required columns: {missing_columns}")
                 return False
         
+        if rules and not self.validate_rows(df, rules).passed:
+            logger.error("Row-level validation failed")
+            return False
+        
         logger.info(f"Data validation passed. Shape: {df.shape}")
         return True
     
-    def get_data_info(self, df):
+    def validate_rows(self, df, rules):
+        """
+        Evaluate row-level validation rules in one vectorized pass
+        
+        Args:
+            df: DataFrame (or chunk) to validate
+            rules: List of validation rules
+            
+        Returns:
+            ValidationResult with the row reject mask, per-rule masks and
+            time spent per rule
+        """
+        result = ValidationEngine(rules).validate(df)
+        logger.info(f"Validated {len(df)} rows against {len(rules)} rules: "
+                    f"{int(result.reject_mask.sum())} rejected")
+        return result
+    
+    def get_data_info(self, df, approximate=False, sample_size=DEFAULT_SAMPLE_SIZE,
+                      distinct=False):
         """
         Get information about extracted data
         
         Args:
             df: DataFrame to analyze
+            approximate: Use the cheap sampled profile, which also reports
+                min/max and error bounds
+            sample_size: Rows sampled in approximate mode
+            distinct: In approximate mode, also estimate distinct counts
+                with HyperLogLog (hashes every value, so not cheap)
             
         Returns:
             Dictionary with data information
         """
+        if approximate:
+            return approximate_profile(df, sample_size=sample_size, distinct=distinct)
+        
         info = {
             'rows': len(df),
             'columns': len(df.columns),
@@ -152,39 +1031,116 @@ class DataExtractor:
         return info
 
 
-def extract_sales_data(data_path='data/raw'):
+def extract_sales_data(data_path='data/raw', chunksize=None, chunk_bytes=None,
+                       cache_dir=None, use_schema=False, manifest=None,
+                       tail_sales=False, concurrent=False, max_workers=4,
+                       projections=None, filters=None, renames=None,
+                       return_metadata=False):
     """
     Extract sales data from CSV files
     
+    Args:
+        data_path: Path to raw data files
+        chunksize: If set, stream sales transactions in chunks of this many rows
+        chunk_bytes: If set, stream sales transactions in chunks of roughly
+            this many bytes in memory
+        cache_dir: If set, reuse parsed sources from a Parquet staging
+            cache in this directory
+        use_schema: Parse sources with compact dtypes from the schema registry
+        manifest: Optional SourceManifest; sources it reports as unchanged
+            are skipped
+        tail_sales: Extract only rows appended to the sales file since the
+            last committed offset
+        concurrent: Read the datasets in parallel on a thread pool
+        max_workers: Number of threads used in concurrent mode
+        projections: Optional dictionary mapping dataset name to the list
+            of columns to extract
+        filters: Optional dictionary mapping dataset name to a list of
+            (column, op, value) row filters
+        renames: Optional dictionary mapping dataset name to a column
+            rename mapping, as returned by preflight_sales_data
+        return_metadata: Also return extraction metadata
+    
     Returns:
-        Dictionary containing all extracted DataFrames
+        Dictionary containing all extracted DataFrames. In streaming mode
+        'sales' is an iterator of DataFrame chunks instead of a DataFrame.
+        If return_metadata is set, a tuple of (data, metadata) where
+        metadata['skipped'] lists datasets skipped as unchanged and
+        metadata['checkpoints'] holds tail checkpoints to commit after load
+        and metadata['timings'] maps each dataset to its read time in seconds
+        (None for streamed datasets, which are read lazily).
     """
-    extractor = DataExtractor(data_path)
+    extractor = DataExtractor(data_path, cache_dir=cache_dir, use_schema=use_schema)
     
     data = {}
+    metadata = {'skipped': [], 'checkpoints': [], 'timings': {}}
+    
+    projections = projections or {}
+    filters = filters or {}
+    renames = renames or {}
+    
+    def header_options(name, filename):
+        # Renaming while parsing lets schema dtypes, projections and filters
+        # all use the registered names
+        if not renames.get(name):
+            return {}
+        with open_source(extractor.data_path / filename) as source:
+            header = pd.read_csv(source, nrows=0).columns
+        return {'names': [renames[name].get(column, column) for column in header], 'header': 0}
+    
+    def extract_dataset(name, filename):
+        start = time.perf_counter()
+        checkpoint = None
+        columns = projections.get(name)
+        row_filters = filters.get(name)
+        options = header_options(name, filename)
+        
+        if name == 'sales' and tail_sales:
+            df, checkpoint = extractor.extract_csv_tail(filename, **options)
+            df = _project(df, columns, row_filters)
+        elif name == 'sales' and (chunksize or chunk_bytes):
+            chunks = extractor.extract_csv_chunks(
+                filename, chunksize=chunksize, chunk_bytes=chunk_bytes,
+                columns=columns, filters=row_filters, **options
+            )
+            logger.info(f"Streaming {name} in chunks")
+            return chunks, checkpoint, None
+        else:
+            df = extractor.extract_csv(filename, columns=columns, filters=row_filters, **options)
+        
+        seconds = time.perf_counter() - start
+        logger.info(f"Extracted {name}: {df.shape} in {seconds:.3f}s")
+        return df, checkpoint, seconds
     
     try:
-        # Extract sales transactions
-        if (extractor.data_path / 'sales_transactions.csv').exists():
-            data['sales'] = extractor.extract_csv('sales_transactions.csv')
-            logger.info(f"Extracted sales: {data['sales'].shape}")
-        
-        # Extract customer data
-        if (extractor.data_path / 'customers.csv').exists():
-            data['customers'] = extractor.extract_csv('customers.csv')
-            logger.info(f"Extracted customers: {data['customers'].shape}")
-        
-        # Extract product data
-        if (extractor.data_path / 'products.csv').exists():
-            data['products'] = extractor.extract_csv('products.csv')
-            logger.info(f"Extracted products: {data['products'].shape}")
-        
-        # Extract sales rep data
-        if (extractor.data_path / 'sales_reps.csv').exists():
-            data['sales_reps'] = extractor.extract_csv('sales_reps.csv')
-            logger.info(f"Extracted sales reps: {data['sales_reps'].shape}")
+        jobs = []
+        for name, filename in SOURCE_FILES.items():
+            filepath = extractor.data_path / filename
+            if not filepath.exists():
+                continue
+            
+            if manifest is not None and not manifest.has_changed(filepath):
+                metadata['skipped'].append(name)
+                logger.info(f"Skipping unchanged {name}: {filename}")
+                continue
+            
+            jobs.append((name, filename))
+        
+        if concurrent and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda job: extract_dataset(*job), jobs))
+        else:
+            results = [extract_dataset(*job) for job in jobs]
+        
+        for (name, _), (df, checkpoint, seconds) in zip(jobs, results):
+            data[name] = df
+            metadata['timings'][name] = seconds
+            if checkpoint is not None:
+                metadata['checkpoints'].append(checkpoint)
         
         logger.info(f"Extraction complete. Total datasets: {len(data)}")
+        if return_metadata:
+            return data, metadata
         return data
         
     except Exception as e:
@@ -192,6 +1148,133 @@ def extract_sales_data(data_path='data/raw'):
         raise
 
 
+def preflight_sales_data(data_path='data/raw', column_mappings=None, fail_on_drift=True):
+    """
+    Check every source's header and a small sample against its registered schema
+    
+    Runs before any full parse or database work, so an upstream column
+    rename fails the run in seconds rather than after a multi-GB read.
+    Configured column mappings resolve known renames instead of failing.
+    
+    Args:
+        data_path: Path to raw data files
+        column_mappings: Optional dictionary mapping dataset name to a
+            dictionary of current column name -> registered column name
+        fail_on_drift: Raise SchemaDriftError on unresolved drift instead of
+            only logging it
+        
+    Returns:
+        Dictionary mapping dataset name to the column renames to apply when
+        extracting (pass as extract_sales_data(renames=...))
+        
+    Raises:
+        SchemaDriftError: If a source drifted and fail_on_drift is set
+    """
+    registry = SchemaRegistry()
+    column_mappings = column_mappings or {}
+    renames = {}
+    drifted = {}
+    checked = 0
+    
+    for name, filename in SOURCE_FILES.items():
+        filepath = Path(data_path) / filename
+        if not filepath.exists():
+            continue
+        checked += 1
+        
+        report = registry.check(filepath, column_mappings.get(name))
+        if report['renames']:
+            renames[name] = report['renames']
+            logger.info(f"Applying column mappings to {name}: {report['renames']}")
+        
+        if report['missing'] or report['unexpected'] or report['type_changes']:
+            drifted[name] = report
+            logger.error(f"Schema drift in {filename}: missing={report['missing']}, "
+                         f"unexpected={report['unexpected']}, types={report['type_changes']}")
+    
+    if drifted and fail_on_drift:
+        raise SchemaDriftError(f"Schema drift detected in: {', '.join(drifted)}")
+    
+    if drifted:
+        logger.warning(f"Preflight schema check found drift in {len(drifted)} of {checked} sources")
+    else:
+        logger.info(f"Preflight schema check passed for {checked} sources")
+    return renames
+
+
+def _hash_sample_mask(keys, fraction, seed):
+    """
+    Deterministically select a fraction of keys by hashing them
+    
+    The same key is always selected or rejected for a given seed, across
+    datasets and runs.
+    
+    Args:
+        keys: Series of key values
+        fraction: Fraction of distinct keys to keep, between 0 and 1
+        seed: String seed for the hash
+        
+    Returns:
+        Boolean numpy array, True for selected keys
+    """
+    hash_key = hashlib.md5(str(seed).encode()).hexdigest()[:16]
+    hashes = pd.util.hash_pandas_object(keys.astype(str), index=False, hash_key=hash_key)
+    return (hashes.to_numpy() % 2**32) < fraction * 2**32
+
+
+def sample_sales_data(data, fraction, seed='dev', customer_key='customer_code',
+                      product_key='product_code', sales_rep_key='employee_code'):
+    """
+    Keep a deterministic, referentially intact sample of the sales datasets
+    
+    A hash-selected fraction of customers is kept together with all of
+    their sales, and only the products and sales reps those sales reference,
+    so every foreign key in the sample still resolves.
+    
+    Args:
+        data: Dictionary of datasets as returned by extract_sales_data
+        fraction: Fraction of customers to keep, between 0 and 1
+        seed: String seed; change it to draw a different sample
+        customer_key: Customer natural key column
+        product_key: Product natural key column
+        sales_rep_key: Sales rep natural key column
+        
+    Returns:
+        Dictionary of sampled datasets. Streamed sales are filtered chunk by
+        chunk, in which case products and sales reps are kept whole.
+    """
+    sampled = dict(data)
+    
+    if 'customers' in data:
+        customers = data['customers']
+        sampled['customers'] = customers[_hash_sample_mask(customers[customer_key], fraction, seed)]
+    
+    sales = data.get('sales')
+    if sales is None:
+        return sampled
+    
+    if not isinstance(sales, pd.DataFrame):
+        sampled['sales'] = (
+            chunk[_hash_sample_mask(chunk[customer_key], fraction, seed)] for chunk in sales
+        )
+        return sampled
+    
+    sales = sales[_hash_sample_mask(sales[customer_key], fraction, seed)]
+    sampled['sales'] = sales
+    
+    if 'products' in data and product_key in sales:
+        products = data['products']
+        sampled['products'] = products[products[product_key].isin(sales[product_key])]
+    
+    if 'sales_reps' in data and sales_rep_key in sales:
+        sales_reps = data['sales_reps']
+        sampled['sales_reps'] = sales_reps[sales_reps[sales_rep_key].isin(sales[sales_rep_key])]
+    
+    sizes = {name: len(df) for name, df in sampled.items() if isinstance(df, pd.DataFrame)}
+    logger.info(f"Sampled {fraction:.2%} of customers: {sizes}")
+    return sampled
+
+
 if __name__ == "__main__":
     # Test extraction
     try:
@@ -0,0 +1,113 @@
+"""
+Data Loading Module
+Loads transformed data into the analytics database
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+logger = logging.getLogger(__name__)
+
+# Fact column -> (dimension table, natural key column, surrogate key column)
+DIMENSION_KEYS = {
+    'customer_code': ('dim_customers', 'customer_code', 'customer_id'),
+    'product_code': ('dim_products', 'product_code', 'product_id'),
+    'employee_code': ('dim_sales_reps', 'employee_code', 'sales_rep_id'),
+    'order_date': ('dim_date', 'full_date', 'date_id')
+}
+
+# Surrogate keys fact_sales allows to be NULL
+NULLABLE_SURROGATES = {'sales_rep_id'}
+
+
+class SurrogateKeyResolver:
+    """
+    Resolves natural keys to dimension surrogate keys in bulk
+    
+    Each dimension's natural -> surrogate map is fetched once with a single
+    query and held as a hashed pandas Index, so whole fact columns resolve
+    with one vectorized get_indexer call instead of per-row lookups or merges.
+    """
+    
+    def __init__(self, engine, dimensions=None):
+        """
+        Initialize resolver
+        
+        Args:
+            engine: SQLAlchemy engine or database URL
+            dimensions: Optional mapping overriding DIMENSION_KEYS
+        """
+        self.engine = create_engine(engine) if isinstance(engine, str) else engine
+        self.dimensions = dimensions or DIMENSION_KEYS
+        self.indexes = {}
+    
+    @staticmethod
+    def _normalize(values, natural_key):
+        """Bring natural keys to a comparable form, e.g. dates to midnight timestamps"""
+        if natural_key == 'full_date':
+            return pd.to_datetime(values, errors='coerce').dt.normalize()
+        return values.astype(object)
+    
+    def _index(self, column):
+        """Fetch and cache the natural -> surrogate map for a fact column"""
+        if column not in self.indexes:
+            table, natural_key, surrogate_key = self.dimensions[column]
+            with self.engine.connect() as connection:
+                rows = pd.read_sql(text(f"SELECT {natural_key}, {surrogate_key} FROM {table}"), connection)
+            
+            natural = pd.Index(self._normalize(rows[natural_key], natural_key))
+            surrogates = rows[surrogate_key].to_numpy(dtype=np.int64)
+            self.indexes[column] = (natural, surrogates)
+            logger.info(f"Cached {len(natural)} {table} keys")
+        return self.indexes[column]
+    
+    def refresh(self):
+        """Drop cached maps so the next resolve() re-reads the dimensions"""
+        self.indexes = {}
+    
+    def resolve(self, df, columns=None):
+        """
+        Add surrogate key columns for every natural key column present
+        
+        Args:
+            df: Fact DataFrame with natural key columns
+            columns: Optional natural key columns to resolve (defaults to
+                every configured column present in df)
+        
+        Returns:
+            Tuple of (DataFrame with surrogate key columns, boolean Series
+            that is True for rows with an unresolved key, for quarantine)
+        """
+        # Surrogate keys already derived upstream, such as date_id, are kept
+        columns = columns or [
+            column for column, (_, _, surrogate_key) in self.dimensions.items()
+            if column in df.columns and surrogate_key not in df.columns
+        ]
+        unresolved = pd.Series(False, index=df.index)
+        surrogates = {}
+        
+        for column in columns:
+            _, natural_key, surrogate_key = self.dimensions[column]
+            natural, ids = self._index(column)
+            
+            values = self._normalize(df[column], natural_key)
+            positions = natural.get_indexer(values)
+            found = positions >= 0
+            
+            # Only found positions index ids, which is empty for an empty dimension
+            keys = np.zeros(len(positions), dtype=np.int64)
+            keys[found] = ids[positions[found]]
+            surrogates[surrogate_key] = pd.array(keys, dtype='Int64')
+            surrogates[surrogate_key][~found] = pd.NA
+            
+            missing = ~found
+            if surrogate_key in NULLABLE_SURROGATES:
+                missing &= values.notna().to_numpy()
+            if missing.any():
+                logger.warning(f"{int(missing.sum())} rows have an unknown {column}")
+            unresolved |= missing
+        
+        return df.assign(**surrogates), unresolved
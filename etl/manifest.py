@@ -0,0 +1,96 @@
+"""
+Source Manifest Module
+Tracks source file fingerprints so unchanged datasets can be skipped
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from etl.staging import hash_file
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path, payload):
+    """
+    Write JSON to a file atomically
+    
+    The payload is written to a temporary file and moved into place, so a
+    crash mid-write never leaves a truncated file behind.
+    
+    Args:
+        path: Destination path
+        payload: JSON-serializable object
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+class SourceManifest:
+    """
+    Records path, size, mtime and content hash for each source file
+    
+    Fingerprints of changed files are staged by has_changed() and only
+    written by commit(), so a failed run re-processes the same files next time.
+    """
+    
+    def __init__(self, manifest_path='data/processed/source_manifest.json'):
+        self.manifest_path = Path(manifest_path)
+        self.entries = {}
+        self.pending = {}
+        
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.entries = json.load(f)
+    
+    def has_changed(self, filepath):
+        """
+        Check whether a source file differs from its recorded fingerprint
+        
+        Size and mtime are compared first; the content hash is only computed
+        when they differ, so touched-but-identical files still count as unchanged.
+        
+        Args:
+            filepath: Path to source file
+        
+        Returns:
+            True if the file is new or its content changed
+        """
+        filepath = Path(filepath)
+        key = str(filepath.resolve())
+        stat = filepath.stat()
+        previous = self.entries.get(key)
+        
+        if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime:
+            return False
+        
+        fingerprint = {
+            'path': key,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': hash_file(filepath)
+        }
+        self.pending[key] = fingerprint
+        
+        if previous and previous['sha256'] == fingerprint['sha256']:
+            logger.info(f"{filepath.name} was touched but its content is unchanged")
+            return False
+        
+        return True
+    
+    def commit(self):
+        """Persist fingerprints staged since the last commit"""
+        if not self.pending:
+            return
+        
+        self.entries.update(self.pending)
+        self.pending = {}
+        write_json_atomic(self.manifest_path, self.entries)
+        logger.info(f"Source manifest updated: {self.manifest_path}")
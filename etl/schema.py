@@ -0,0 +1,267 @@
+"""
+Schema Registry Module
+Learns compact column dtypes for each source and persists them next to the data
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl.compression import open_source
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Sidecar file suffix, e.g. sales_transactions.csv.schema.json
+SCHEMA_SUFFIX = '.schema.json'
+
+# Rows read when learning a schema for the first time
+LEARN_SAMPLE_ROWS = 100_000
+
+# Rows read by the preflight drift check
+PREFLIGHT_SAMPLE_ROWS = 100
+
+# Object columns with at most this ratio of distinct values become categories
+CATEGORY_MAX_RATIO = 0.5
+
+# Largest absolute value float32 can hold while still resolving cents: its
+# spacing is 1/128 below 2**17 and coarser than a cent above, so keep a margin
+FLOAT32_MAX_EXACT_CENTS = 2**16
+
+# ENUM values declared in database/schema.sql, per table and column
+SCHEMA_ENUMS = {
+    'dim_customers': {
+        'customer_type': ['Individual', 'Business', 'Enterprise'],
+        'segment': ['Premium', 'Standard', 'Basic'],
+        'status': ['Active', 'Inactive', 'Suspended']
+    },
+    'dim_products': {
+        'status': ['Active', 'Discontinued', 'Out of Stock']
+    },
+    'dim_sales_reps': {
+        'status': ['Active', 'Inactive', 'On Leave']
+    },
+    'fact_sales': {
+        'payment_method': ['Credit Card', 'Debit Card', 'Cash', 'Bank Transfer', 'Other'],
+        'order_status': ['Pending', 'Completed', 'Cancelled', 'Returned']
+    }
+}
+
+# Integer columns are pinned nullable, so a later blank value still parses;
+# sidecars written before this map onto the nullable dtypes when read
+NULLABLE_INTEGERS = {'int32': 'Int32', 'int64': 'Int64'}
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+
+class SchemaDriftError(ValueError):
+    """Raised when a source no longer matches its registered schema"""
+
+
+def _dtype_kind(dtype):
+    """Coarse dtype family used to compare a sample with the registered schema"""
+    if dtype.lower() in ('int32', 'int64', 'float32', 'float64'):
+        return 'numeric'
+    if dtype.startswith('datetime'):
+        return 'datetime'
+    if dtype == 'bool':
+        return 'bool'
+    return 'text'
+
+
+def infer_compact_dtypes(df):
+    """
+    Infer the most compact safe dtype for each column of a DataFrame
+    
+    Args:
+        df: DataFrame parsed with default pandas inference
+    
+    Returns:
+        Dictionary mapping column name to dtype string
+    """
+    dtypes = {}
+    
+    for column in df.columns:
+        series = df[column]
+        non_null = series.dropna()
+        
+        if pd.api.types.is_bool_dtype(series):
+            dtypes[column] = 'bool'
+        elif pd.api.types.is_integer_dtype(series):
+            if non_null.empty or (non_null.min() >= INT32_MIN and non_null.max() <= INT32_MAX):
+                dtypes[column] = 'Int32'
+            else:
+                dtypes[column] = 'Int64'
+        elif pd.api.types.is_float_dtype(series):
+            if non_null.empty or non_null.abs().max() < FLOAT32_MAX_EXACT_CENTS:
+                dtypes[column] = 'float32'
+            else:
+                dtypes[column] = 'float64'
+        elif _looks_like_dates(column, non_null):
+            dtypes[column] = 'datetime64[ns]'
+        elif len(non_null) and non_null.nunique() / len(non_null) <= CATEGORY_MAX_RATIO:
+            dtypes[column] = 'category'
+        else:
+            dtypes[column] = 'object'
+    
+    return dtypes
+
+
+def _looks_like_dates(column, values):
+    """Check whether a date-named object column parses cleanly as datetimes"""
+    name = str(column).lower()
+    if values.empty or ('date' not in name and 'time' not in name):
+        return False
+    
+    parsed = pd.to_datetime(values, errors='coerce')
+    return bool(parsed.notna().all())
+
+
+class SchemaRegistry:
+    """Persists learned dtypes as a sidecar schema file next to each source"""
+    
+    def __init__(self, sample_rows=LEARN_SAMPLE_ROWS):
+        self.sample_rows = sample_rows
+    
+    @staticmethod
+    def sidecar_path(filepath):
+        """
+        Get the schema sidecar path for a source file
+        
+        Args:
+            filepath: Path to source file
+        
+        Returns:
+            Path of the sidecar schema file
+        """
+        filepath = Path(filepath)
+        return filepath.with_name(filepath.name + SCHEMA_SUFFIX)
+    
+    def load(self, filepath):
+        """
+        Load the registered schema for a source file
+        
+        Args:
+            filepath: Path to source file
+        
+        Returns:
+            Schema dictionary, or None if no schema is registered
+        """
+        sidecar = self.sidecar_path(filepath)
+        if not sidecar.exists():
+            return None
+        
+        with open(sidecar) as f:
+            return json.load(f)
+    
+    def learn(self, filepath, **kwargs):
+        """
+        Infer and persist the schema for a source file
+        
+        Args:
+            filepath: Path to source file
+            **kwargs: Additional arguments for pd.read_csv
+        
+        Returns:
+            Schema dictionary
+        """
+        with open_source(filepath) as source:
+            sample = pd.read_csv(source, nrows=self.sample_rows, **kwargs)
+        schema = {
+            'columns': list(sample.columns),
+            'dtypes': infer_compact_dtypes(sample)
+        }
+        
+        with open(self.sidecar_path(filepath), 'w') as f:
+            json.dump(schema, f, indent=2)
+        
+        logger.info(f"Registered schema for {Path(filepath).name}: {schema['dtypes']}")
+        return schema
+    
+    def get(self, filepath, **kwargs):
+        """
+        Get the registered schema, learning it on first use
+        
+        Args:
+            filepath: Path to source file
+            **kwargs: Additional arguments for pd.read_csv when learning
+        
+        Returns:
+            Schema dictionary
+        """
+        return self.load(filepath) or self.learn(filepath, **kwargs)
+    
+    def check(self, filepath, column_mappings=None, sample_rows=PREFLIGHT_SAMPLE_ROWS, **kwargs):
+        """
+        Compare a source's header and a small sample with its registered schema
+        
+        Only the first sample_rows rows are parsed, so drift is caught before
+        the full file is read. A source without a registered schema has one
+        learned from a sample instead.
+        
+        Args:
+            filepath: Path to source file
+            column_mappings: Optional dictionary mapping current column names
+                to registered names, applied before comparing
+            sample_rows: Number of rows to sample
+            **kwargs: Additional arguments for pd.read_csv
+        
+        Returns:
+            Dictionary with 'missing' and 'unexpected' column lists, a
+            'type_changes' dictionary and the 'renames' to apply on read
+        """
+        schema = self.load(filepath)
+        if schema is None:
+            self.learn(filepath, **kwargs)
+            return {'missing': [], 'unexpected': [], 'type_changes': {}, 'renames': {}}
+        
+        with open_source(filepath) as source:
+            sample = pd.read_csv(source, nrows=sample_rows, **kwargs)
+        renames = {old: new for old, new in (column_mappings or {}).items()
+                   if old in sample.columns}
+        sample = sample.rename(columns=renames)
+        
+        registered = schema['columns']
+        sample_dtypes = infer_compact_dtypes(sample)
+        type_changes = {
+            column: {'registered': schema['dtypes'][column], 'sample': sample_dtypes[column]}
+            for column in registered
+            if column in sample_dtypes and sample[column].notna().any()
+            and _dtype_kind(schema['dtypes'][column]) != _dtype_kind(sample_dtypes[column])
+        }
+        
+        return {
+            'missing': [column for column in registered if column not in sample.columns],
+            'unexpected': [column for column in sample.columns if column not in registered],
+            'type_changes': type_changes,
+            'renames': renames
+        }
+    
+    def read_options(self, filepath, **kwargs):
+        """
+        Build pd.read_csv arguments that pin the registered dtypes
+        
+        Args:
+            filepath: Path to source file
+            **kwargs: Additional arguments for pd.read_csv when learning
+        
+        Returns:
+            Dictionary with dtype and parse_dates arguments
+        """
+        dtypes = self.get(filepath, **kwargs)['dtypes']
+        
+        return {
+            'dtype': {col: NULLABLE_INTEGERS.get(dtype, dtype) for col, dtype in dtypes.items()
+                      if not dtype.startswith('datetime')},
+            'parse_dates': [col for col, dtype in dtypes.items()
+                            if dtype.startswith('datetime')]
+        }
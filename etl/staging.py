@@ -0,0 +1,168 @@
+"""
+Staging Cache Module
+Caches parsed raw inputs as Parquet files keyed by content hash
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Block size used when hashing source files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Default upper bound on the total size of the cache directory
+DEFAULT_MAX_BYTES = 5 * 1024**3
+
+
+def hash_file(filepath):
+    """
+    Compute the SHA-256 digest of a file's content
+    
+    Args:
+        filepath: Path to file
+        
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StagingCache:
+    """
+    Content-addressed Parquet cache for parsed source files
+    
+    Each entry is keyed by a hash of the source file content plus the parse
+    options used to read it, so a changed file or different options never
+    return a stale entry. Hits are read with memory mapping, and the least
+    recently used entries are evicted once the cache exceeds max_bytes.
+    """
+    
+    def __init__(self, cache_dir='data/processed/staging', max_bytes=DEFAULT_MAX_BYTES):
+        if pq is None:
+            raise ImportError("pyarrow is required for the staging cache")
+        
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        
+        # Serializes writes and eviction when datasets are extracted concurrently
+        self._lock = threading.Lock()
+    
+    def key(self, filepath, options=None):
+        """
+        Build the cache key for a source file and its parse options
+        
+        Args:
+            filepath: Path to source file
+            options: Dictionary of parse options
+        
+        Returns:
+            Hex digest identifying the parsed content
+        """
+        digest = hashlib.sha256(hash_file(filepath).encode())
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+    
+    def get(self, key, columns=None, filters=None):
+        """
+        Read a cached entry
+        
+        Args:
+            key: Cache key from key()
+            columns: Optional list of columns to read
+            filters: Optional list of (column, op, value) filters. Filters
+                whose value type matches the stored column are pushed into
+                the Parquet read; callers should re-apply the full list.
+        
+        Returns:
+            Cached DataFrame, or None on a cache miss
+        """
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+        
+        # Touch the entry so eviction treats it as recently used
+        os.utime(path)
+        
+        if filters:
+            filters = self._pushable_filters(pq.read_schema(path), filters) or None
+        
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+        logger.info(f"Staging cache hit: {path.name}")
+        return table.to_pandas()
+    
+    def put(self, key, df):
+        """
+        Store a parsed DataFrame in the cache
+        
+        Caching is best-effort: frames Parquet cannot represent, such as
+        object columns mixing numbers and strings, are logged and skipped.
+        
+        Args:
+            key: Cache key from key()
+            df: DataFrame to store
+        
+        Returns:
+            True if the entry was stored
+        """
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        
+        # Write to a temporary file first so readers never see partial entries
+        try:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        except (pa.ArrowException, OSError) as e:
+            logger.warning(f"Not staging {path.name}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+        
+        with self._lock:
+            os.replace(tmp_path, path)
+            logger.info(f"Staged {len(df)} records to {path.name}")
+            self._evict()
+        return True
+    
+    @staticmethod
+    def _pushable_filters(schema, filters):
+        """Select filters Parquet can evaluate, normalizing date values"""
+        pushable = []
+        for column, op, value in filters:
+            if isinstance(value, date):
+                if not pa.types.is_timestamp(schema.field(column).type):
+                    continue
+                if not isinstance(value, datetime):
+                    value = datetime.combine(value, datetime.min.time())
+            pushable.append((column, op, value))
+        return pushable
+    
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.parquet"
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.cache_dir.glob('*.parquet'), key=lambda p: p.stat().st_mtime)
+        total_bytes = sum(p.stat().st_size for p in entries)
+        
+        for path in entries[:-1]:
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= path.stat().st_size
+            path.unlink()
+            logger.info(f"Evicted staging cache entry: {path.name}")
@@ -0,0 +1,524 @@
+"""
+Data Transformation Module
+Cleans and reshapes extracted data for loading into the analytics database
+"""
+
+import logging
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from etl.extract import apply_filters
+from etl.load import DIMENSION_KEYS, SurrogateKeyResolver
+from etl.schema import SCHEMA_ENUMS, CATEGORY_MAX_RATIO, FLOAT32_MAX_EXACT_CENTS
+
+logger = logging.getLogger(__name__)
+
+# Characters dropped from column names after lowercasing
+NON_IDENTIFIER_CHARS = re.compile(r'[^a-z0-9_]')
+
+# Distinct raw headers remembered by the column name cache
+HEADER_CACHE_SIZE = 256
+
+# fact_sales DECIMAL(*,2) measures derived by compute_sales_measures
+SALES_MEASURES = ['discount_amount', 'subtotal', 'tax_amount', 'total_amount', 'cost_amount']
+
+# DECIMAL inputs carried into the fact output, never downcast to float32
+SALES_DECIMAL_INPUTS = ['unit_price', 'cost_price', 'discount_percent', 'tax_percent']
+
+# Columns MySQL generates from total_amount and cost_amount
+GENERATED_SALES_COLUMNS = ['profit_amount', 'profit_margin']
+
+# Date range populate_date_dimension writes to dim_date, starting at date_id 1
+DATE_DIMENSION_START = pd.Timestamp('2020-01-01')
+DATE_DIMENSION_END = pd.Timestamp('2030-12-31')
+
+
+def _buffers(series):
+    """numpy arrays holding a column's values, or an empty list if not numpy-backed"""
+    buffers = (getattr(series.array, name, None) for name in ('_ndarray', '_data', '_mask'))
+    return [buffer for buffer in buffers if isinstance(buffer, np.ndarray)]
+
+
+def _unshare(df, source):
+    """
+    Copy the columns of df that may share memory with source
+    
+    Columns whose storage cannot be inspected, such as Arrow-backed ones,
+    are copied to be safe.
+    """
+    source_buffers = [buffer for i in range(source.shape[1])
+                      for buffer in _buffers(source.iloc[:, i])]
+    shared = []
+    for i in range(df.shape[1]):
+        buffers = _buffers(df.iloc[:, i])
+        if not buffers or any(np.may_share_memory(buffer, other)
+                              for buffer in buffers for other in source_buffers):
+            shared.append(i)
+    
+    if shared:
+        df = df.copy(deep=False)
+        for i in shared:
+            df.isetitem(i, df.iloc[:, i].copy())
+    return df
+
+
+def _compact_series(series, categories=None):
+    """Most compact representation of a column that keeps every value"""
+    if categories is not None:
+        allowed = set(categories)
+        extra = [value for value in series.dropna().unique() if value not in allowed]
+        if extra:
+            logger.warning(f"{series.name} has values outside its ENUM: {extra[:5]}")
+        return series.astype(pd.CategoricalDtype(list(categories) + extra))
+    
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        non_null = series.dropna()
+        if non_null.empty or non_null.abs().max() < FLOAT32_MAX_EXACT_CENTS:
+            return series.astype('float32')
+        return series
+    if series.dtype == object:
+        non_null = series.dropna()
+        if len(non_null) and non_null.nunique() / len(non_null) <= CATEGORY_MAX_RATIO:
+            return series.astype('category')
+    return series
+
+
+def _to_hundredths(series):
+    """Scale a 2-decimal column to int64 hundredths, rounding half away from zero"""
+    values = pd.to_numeric(series, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    return (np.sign(values) * np.floor(np.abs(values) * 100 + 0.5)).astype(np.int64)
+
+
+def _divide_round(numerator, denominator):
+    """Integer division rounding half away from zero, like MySQL DECIMAL"""
+    return np.sign(numerator) * ((np.abs(numerator) * 2 + denominator) // (2 * denominator))
+
+
+@lru_cache(maxsize=HEADER_CACHE_SIZE)
+def _clean_header(columns):
+    """Map a raw header tuple to cleaned names, memoized process-wide"""
+    return tuple(
+        NON_IDENTIFIER_CHARS.sub('', str(column).strip().lower().replace(' ', '_'))
+        for column in columns
+    )
+
+
+class DataTransformer:
+    """Class for cleaning and transforming DataFrames"""
+    
+    def __init__(self, dedup_index=None):
+        """
+        Initialize transformer
+        
+        Args:
+            dedup_index: Optional DedupIndex extending remove_duplicates
+                across chunks and pipeline runs
+        """
+        self.dedup_index = dedup_index
+        self.compaction_report = {}
+    
+    def clean_column_names(self, df):
+        """
+        Normalize column names, e.g. 'Order Number' -> 'order_number'
+        
+        Names are lowercased, spaces become underscores and any other
+        non-alphanumeric characters are dropped. The mapping is cached per
+        distinct header, so streamed chunks sharing a header only pay the
+        regex cost once, and the rename does not copy column data.
+        
+        Args:
+            df: DataFrame to clean
+        
+        Returns:
+            DataFrame with cleaned column names
+        """
+        columns = _clean_header(tuple(df.columns))
+        return df.set_axis(columns, axis=1, copy=False)
+    
+    def remove_duplicates(self, df, subset=None, keep='first'):
+        """
+        Remove duplicate rows
+        
+        With a dedup index and a key subset, rows whose key was already seen
+        in an earlier chunk or committed run are removed as well.
+        
+        Args:
+            df: DataFrame to deduplicate
+            subset: Columns identifying duplicates (all columns if None)
+            keep: Which occurrence to keep within df
+            
+        Returns:
+            DataFrame without duplicates
+        """
+        before = len(df)
+        df = df.drop_duplicates(subset=subset, keep=keep)
+        if self.dedup_index is not None and subset:
+            df = self.dedup_index.filter(df, list(subset))
+        
+        removed = before - len(df)
+        if removed:
+            logger.info(f"Removed {removed} duplicate rows")
+        return df
+    
+    def convert_data_types(self, df, type_mapping=None, compact=False, table=None):
+        """
+        Convert column data types
+        
+        In compact mode, columns without an explicit type become the smallest
+        lossless representation: ENUM columns of the target table become
+        categoricals with the ENUM's categories, other low-cardinality text
+        becomes categorical, integers are downcast to the narrowest width and
+        floats to float32 while cents stay exact. Bytes saved per column are
+        stored in compaction_report.
+        
+        Args:
+            df: DataFrame to convert
+            type_mapping: Optional dictionary of column -> dtype
+            compact: Compact the remaining columns
+            table: Database table whose SCHEMA_ENUMS apply in compact mode
+            
+        Returns:
+            DataFrame with converted types
+        """
+        try:
+            type_mapping = type_mapping or {}
+            if type_mapping:
+                df = df.astype(type_mapping)
+            if not compact:
+                return df
+            
+            enums = SCHEMA_ENUMS.get(table, {})
+            before = df.memory_usage(index=False, deep=True)
+            df = df.copy(deep=False)
+            for column in df.columns:
+                if column not in type_mapping:
+                    df[column] = _compact_series(df[column], enums.get(column))
+            after = df.memory_usage(index=False, deep=True)
+            
+            self.compaction_report = {column: int(before[column] - after[column]) for column in df.columns}
+            logger.info(f"Compacted {len(df.columns)} columns: {before.sum() / 1024**2:.1f} MB -> "
+                        f"{after.sum() / 1024**2:.1f} MB")
+            return df
+            
+        except Exception as e:
+            logger.error(f"Data type conversion failed: {str(e)}")
+            raise
+
+
+class TransformPlan:
+    """
+    Lazily recorded chain of DataTransformer steps
+    
+    Steps are only recorded until execute(), which first optimizes the chain:
+    row filters move ahead of steps they commute with (ahead of a dedup only
+    when they read nothing but its key columns), adjacent filters and type
+    conversions are fused, and columns a final select() drops are removed
+    before any other work. Execution runs with copy-on-write, so untouched
+    columns are not copied along the chain; only those still shared with the
+    input at the end are copied, so the result never shares memory with it.
+    """
+    
+    def __init__(self, transformer=None):
+        self.transformer = transformer or DataTransformer()
+        self.steps = []
+    
+    def clean_column_names(self):
+        self.steps.append(('clean_column_names', None))
+        return self
+    
+    def filter(self, filters):
+        """Keep rows matching every (column, op, value) filter"""
+        self.steps.append(('filter', list(filters)))
+        return self
+    
+    def remove_duplicates(self, subset, keep='first'):
+        self.steps.append(('remove_duplicates', (list(subset), keep)))
+        return self
+    
+    def convert_data_types(self, type_mapping):
+        self.steps.append(('convert_data_types', dict(type_mapping)))
+        return self
+    
+    def select(self, columns):
+        self.steps.append(('select', list(columns)))
+        return self
+    
+    def compact(self, table=None):
+        """Compact column representations, see DataTransformer.convert_data_types"""
+        self.steps.append(('compact', table))
+        return self
+    
+    @staticmethod
+    def _commutes(filter_columns, step):
+        """Whether a filter reading filter_columns can run before step"""
+        op, arg = step
+        if op == 'convert_data_types':
+            return not filter_columns & set(arg)
+        if op == 'remove_duplicates':
+            return filter_columns <= set(arg[0])
+        return op in ('filter', 'select')
+    
+    def optimize(self):
+        """
+        Rewrite the recorded steps into an equivalent, cheaper chain
+        
+        Returns:
+            List of (operation, argument) steps
+        """
+        steps = []
+        for step in self.steps:
+            steps.append(step)
+            if step[0] != 'filter':
+                continue
+            
+            # Move the filter ahead of every step it commutes with
+            columns = {column for column, _, _ in step[1]}
+            position = len(steps) - 1
+            while position > 0 and self._commutes(columns, steps[position - 1]):
+                steps[position - 1], steps[position] = steps[position], steps[position - 1]
+                position -= 1
+        
+        fused = []
+        for op, arg in steps:
+            if fused and fused[-1][0] == op == 'filter':
+                fused[-1] = (op, fused[-1][1] + arg)
+            elif fused and fused[-1][0] == op == 'convert_data_types':
+                fused[-1] = (op, {**fused[-1][1], **arg})
+            else:
+                fused.append((op, arg))
+        
+        if fused and fused[-1][0] == 'select':
+            fused = self._eliminate_dead_columns(fused)
+        return fused
+    
+    @staticmethod
+    def _eliminate_dead_columns(steps):
+        """Project to the columns a final select() needs right after renaming"""
+        needed = set(steps[-1][1])
+        for op, arg in steps[:-1]:
+            if op == 'filter':
+                needed.update(column for column, _, _ in arg)
+            elif op == 'remove_duplicates':
+                needed.update(arg[0])
+        
+        start = 0
+        while start < len(steps) and steps[start][0] == 'clean_column_names':
+            start += 1
+        
+        optimized = steps[:start] + [('select', sorted(needed))]
+        for op, arg in steps[start:-1]:
+            if op == 'convert_data_types':
+                arg = {column: dtype for column, dtype in arg.items() if column in needed}
+                if not arg:
+                    continue
+            optimized.append((op, arg))
+        return optimized + [steps[-1]]
+    
+    def execute(self, df):
+        """
+        Optimize the plan and run it over a DataFrame
+        
+        Args:
+            df: Input DataFrame
+        
+        Returns:
+            Transformed DataFrame that shares no data with the input
+        """
+        steps = self.optimize()
+        logger.debug(f"Executing transform plan: {[op for op, _ in steps]}")
+        source = df
+        
+        with pd.option_context('mode.copy_on_write', True):
+            for op, arg in steps:
+                if op == 'clean_column_names':
+                    df = self.transformer.clean_column_names(df)
+                elif op == 'filter':
+                    df = apply_filters(df, arg)
+                elif op == 'remove_duplicates':
+                    df = self.transformer.remove_duplicates(df, subset=arg[0], keep=arg[1])
+                elif op == 'convert_data_types':
+                    df = self.transformer.convert_data_types(df, arg)
+                elif op == 'compact':
+                    df = self.transformer.convert_data_types(df, compact=True, table=arg)
+                elif op == 'select':
+                    df = df[[column for column in arg if column in df.columns]]
+            
+            # Copy-on-write is off again once this returns, so columns still
+            # shared with the input would let in-place edits reach it
+            return _unshare(df, source)
+
+
+def compute_sales_measures(df, tax_percent=0):
+    """
+    Derive the fact_sales DECIMAL measures with exact int64 cents arithmetic
+    
+    Prices, percents and costs are scaled to integer hundredths once, every
+    measure is computed with integer numpy operations, and each rounding
+    step rounds half away from zero as MySQL does for DECIMAL(15,2). The
+    results are returned as cents / 100, which MySQL stores exactly. A
+    profit_amount present in the input is reconciled against
+    total_amount - cost_amount and then dropped with the other generated
+    columns.
+    
+    Args:
+        df: Sales DataFrame with quantity and unit_price, and optionally
+            discount_percent, tax_percent and cost_price (unit cost)
+        tax_percent: Tax rate used when there is no tax_percent column
+        
+    Returns:
+        DataFrame with discount_amount, subtotal, tax_amount, total_amount
+        and, when costs are known, cost_amount
+    """
+    quantity = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    
+    def percent_of(cents, column, default):
+        rate = _to_hundredths(df[column]) if column in df.columns else np.int64(round(default * 100))
+        return _divide_round(cents * rate, 10_000)
+    
+    gross = quantity * _to_hundredths(df['unit_price'])
+    discount = percent_of(gross, 'discount_percent', 0)
+    subtotal = gross - discount
+    tax = percent_of(subtotal, 'tax_percent', tax_percent)
+    total = subtotal + tax
+    
+    measures = {
+        'discount_amount': discount,
+        'subtotal': subtotal,
+        'tax_amount': tax,
+        'total_amount': total
+    }
+    if 'cost_price' in df.columns:
+        cost = quantity * _to_hundredths(df['cost_price'])
+        measures['cost_amount'] = cost
+        
+        if 'profit_amount' in df.columns:
+            mismatched = _to_hundredths(df['profit_amount']) != total - cost
+            if mismatched.any():
+                logger.warning(f"{int(mismatched.sum())} rows have a profit_amount that does not "
+                               f"reconcile with total_amount - cost_amount")
+    
+    df = df.drop(columns=[column for column in GENERATED_SALES_COLUMNS if column in df.columns])
+    return df.assign(**{name: cents / 100 for name, cents in measures.items()})
+
+
+class DateIdCalculator:
+    """
+    Derives dim_date surrogate keys by date arithmetic
+    
+    dim_date is populated contiguously, so date_id is the first date's id
+    plus the number of days since it. With an engine, that layout is checked
+    once against the table's min/max ids and dates and its row count; if the
+    table has gaps, ids come from a one-time bulk lookup instead.
+    """
+    
+    def __init__(self, engine=None):
+        """
+        Initialize calculator
+        
+        Args:
+            engine: Optional SQLAlchemy engine; without one the layout
+                written by populate_date_dimension is assumed
+        """
+        self.engine = engine
+        self.first_date = DATE_DIMENSION_START
+        self.last_date = DATE_DIMENSION_END
+        self.first_id = 1
+        self.resolver = None
+        self.validated = engine is None
+    
+    def _validate(self):
+        """Check dim_date is contiguous in both ids and dates, else fall back to lookup"""
+        with self.engine.connect() as connection:
+            min_id, max_id, count, min_date, max_date = connection.execute(text(
+                "SELECT MIN(date_id), MAX(date_id), COUNT(*), MIN(full_date), MAX(full_date) FROM dim_date"
+            )).one()
+            
+            contiguous = bool(count)
+            if contiguous:
+                min_date, max_date = pd.Timestamp(min_date), pd.Timestamp(max_date)
+                edge_ids = connection.execute(
+                    text("SELECT date_id FROM dim_date WHERE full_date IN (:first, :last) ORDER BY full_date"),
+                    {'first': min_date.strftime('%Y-%m-%d'), 'last': max_date.strftime('%Y-%m-%d')}
+                ).scalars().all()
+                contiguous = (max_id - min_id + 1 == count == (max_date - min_date).days + 1
+                              and edge_ids == [min_id, max_id])
+        
+        if contiguous:
+            self.first_date, self.last_date, self.first_id = min_date, max_date, min_id
+            logger.info(f"dim_date is contiguous from {min_date.date()}; deriving date_id arithmetically")
+        else:
+            self.resolver = SurrogateKeyResolver(
+                self.engine, {'order_date': DIMENSION_KEYS['order_date']}
+            )
+            logger.warning("dim_date has gaps; falling back to date_id lookup")
+        self.validated = True
+    
+    def date_ids(self, dates):
+        """
+        Compute date_id for a column of dates
+        
+        Args:
+            dates: Series of dates, datetimes or date strings
+        
+        Returns:
+            Tuple of (Int64 array of date_id, boolean array that is True where
+            the date is missing or outside dim_date)
+        """
+        if not self.validated:
+            self._validate()
+        
+        if self.resolver is not None:
+            resolved, unresolved = self.resolver.resolve(dates.to_frame('order_date'))
+            return resolved['date_id'].array, unresolved.to_numpy()
+        
+        days = pd.to_datetime(dates, errors='coerce').dt.normalize()
+        in_range = days.between(self.first_date, self.last_date).to_numpy()
+        offsets = (days - self.first_date).dt.days.fillna(0).to_numpy(dtype=np.int64)
+        
+        ids = pd.array(self.first_id + offsets, dtype='Int64')
+        ids[~in_range] = pd.NA
+        return ids, ~in_range
+
+
+def transform_sales_data(df, dedup_index=None, date_ids=None):
+    """
+    Transform raw sales transactions for the fact_sales table
+    
+    Args:
+        df: Raw sales DataFrame
+        dedup_index: Optional DedupIndex dropping orders seen in earlier
+            chunks or runs
+        date_ids: Optional DateIdCalculator adding date_id from order_date
+        
+    Returns:
+        Transformed sales DataFrame
+    """
+    transformer = DataTransformer(dedup_index)
+    plan = (TransformPlan(transformer)
+            .clean_column_names()
+            .remove_duplicates(subset=['order_number']))
+    df = plan.execute(df)
+    
+    if {'quantity', 'unit_price'} <= set(df.columns):
+        df = compute_sales_measures(df)
+    
+    if date_ids is not None and 'order_date' in df.columns:
+        ids, unresolved = date_ids.date_ids(df['order_date'])
+        df = df.assign(date_id=ids)
+        if unresolved.any():
+            logger.warning(f"{int(unresolved.sum())} sales rows have an order_date outside dim_date")
+    
+    # DECIMAL columns keep float64 so compaction cannot round their cents
+    decimals = {column: 'float64' for column in SALES_MEASURES + SALES_DECIMAL_INPUTS
+                if column in df.columns}
+    df = transformer.convert_data_types(df, decimals, compact=True, table='fact_sales')
+    logger.info(f"Transformed {len(df)} sales records")
+    return df
@@ -0,0 +1,218 @@
+"""
+Validation Module
+Declarative, vectorized row-level validation rules
+"""
+
+import logging
+import time
+
+import pandas as pd
+
+from etl.schema import SCHEMA_ENUMS
+
+logger = logging.getLogger(__name__)
+
+
+class Rule:
+    """
+    Base class for validation rules
+    
+    Subclasses implement violations(df), returning a boolean Series that is
+    True for rows breaking the rule. Null values only fail NotNullRule.
+    """
+    
+    def __init__(self, column, name=None):
+        self.column = column
+        self.name = name or f"{type(self).__name__}({column})"
+    
+    def violations(self, df):
+        raise NotImplementedError
+
+
+class NotNullRule(Rule):
+    """Rejects rows where the column is null"""
+    
+    def violations(self, df):
+        return df[self.column].isna()
+
+
+class RangeRule(Rule):
+    """Rejects rows outside an inclusive [min_value, max_value] range"""
+    
+    def __init__(self, column, min_value=None, max_value=None, name=None):
+        super().__init__(column, name)
+        self.min_value = min_value
+        self.max_value = max_value
+    
+    def violations(self, df):
+        values = pd.to_numeric(df[self.column], errors='coerce')
+        # Unparseable values are violations; genuine nulls are not
+        mask = values.isna() & df[self.column].notna()
+        if self.min_value is not None:
+            mask |= values < self.min_value
+        if self.max_value is not None:
+            mask |= values > self.max_value
+        return mask
+
+
+class EnumRule(Rule):
+    """Rejects rows whose value is not one of the allowed values"""
+    
+    def __init__(self, column, allowed, name=None):
+        super().__init__(column, name)
+        self.allowed = list(allowed)
+    
+    def violations(self, df):
+        return df[self.column].notna() & ~df[self.column].isin(self.allowed)
+
+
+class RegexRule(Rule):
+    """Rejects rows whose value does not fully match a regular expression"""
+    
+    def __init__(self, column, pattern, name=None):
+        super().__init__(column, name)
+        self.pattern = pattern
+    
+    def violations(self, df):
+        values = df[self.column]
+        matches = values.astype('string').str.fullmatch(self.pattern)
+        return values.notna() & ~matches.fillna(False).astype(bool)
+
+
+class UniqueRule(Rule):
+    """Rejects repeated occurrences of a key, keeping the first"""
+    
+    def __init__(self, columns, name=None):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        super().__init__(columns, name or f"UniqueRule({', '.join(columns)})")
+    
+    def violations(self, df):
+        return df.duplicated(subset=self.column, keep='first')
+
+
+class ForeignKeyRule(Rule):
+    """Rejects rows whose key does not exist in a dimension's key set"""
+    
+    def __init__(self, column, keys, name=None):
+        super().__init__(column, name)
+        self.keys = pd.Index(keys)
+    
+    def violations(self, df):
+        return df[self.column].notna() & ~df[self.column].isin(self.keys)
+
+
+class ValidationResult:
+    """Outcome of validating one chunk"""
+    
+    def __init__(self, reject_mask, rule_masks, rule_seconds):
+        self.reject_mask = reject_mask
+        self.rule_masks = rule_masks
+        self.rule_seconds = rule_seconds
+    
+    @property
+    def passed(self):
+        return not self.reject_mask.any()
+    
+    @property
+    def rejected_counts(self):
+        return {name: int(mask.sum()) for name, mask in self.rule_masks.items()}
+    
+    def split(self, df):
+        """
+        Split a DataFrame into valid and rejected rows
+        
+        Args:
+            df: DataFrame the result was computed for
+        
+        Returns:
+            Tuple of (valid rows, rejected rows)
+        """
+        return df[~self.reject_mask], df[self.reject_mask]
+
+
+class ValidationEngine:
+    """Evaluates a set of rules over each chunk in a single vectorized pass"""
+    
+    def __init__(self, rules):
+        self.rules = list(rules)
+    
+    def validate(self, df):
+        """
+        Evaluate every rule against a DataFrame
+        
+        Rules referencing columns missing from the frame are skipped with a
+        warning, since required columns are checked separately.
+        
+        Args:
+            df: DataFrame to validate
+        
+        Returns:
+            ValidationResult with the combined reject mask, per-rule masks
+            and per-rule evaluation time
+        """
+        reject_mask = pd.Series(False, index=df.index)
+        rule_masks = {}
+        rule_seconds = {}
+        
+        for rule in self.rules:
+            columns = rule.column if isinstance(rule.column, list) else [rule.column]
+            missing = [column for column in columns if column not in df.columns]
+            if missing:
+                logger.warning(f"Skipping {rule.name}: missing columns {missing}")
+                continue
+            
+            start = time.perf_counter()
+            mask = rule.violations(df)
+            rule_seconds[rule.name] = time.perf_counter() - start
+            
+            rule_masks[rule.name] = mask
+            reject_mask |= mask
+        
+        result = ValidationResult(reject_mask, rule_masks, rule_seconds)
+        if not result.passed:
+            failures = {name: count for name, count in result.rejected_counts.items() if count}
+            logger.warning(f"Rejected {int(reject_mask.sum())} of {len(df)} rows: {failures}")
+        return result
+
+
+def enum_rules(table):
+    """
+    Build EnumRules for every ENUM column of a database table
+    
+    Args:
+        table: Table name in SCHEMA_ENUMS, e.g. 'fact_sales'
+    
+    Returns:
+        List of EnumRule
+    """
+    return [EnumRule(column, allowed) for column, allowed in SCHEMA_ENUMS[table].items()]
+
+
+def sales_rules(customer_codes=None, product_codes=None, employee_codes=None):
+    """
+    Build the default rule set for sales transactions
+    
+    Args:
+        customer_codes: Optional valid customer codes for a foreign-key check
+        product_codes: Optional valid product codes for a foreign-key check
+        employee_codes: Optional valid employee codes for a foreign-key check
+    
+    Returns:
+        List of rules matching the fact_sales constraints
+    """
+    rules = [
+        NotNullRule('order_number'),
+        UniqueRule('order_number'),
+        RangeRule('quantity', min_value=1),
+        RangeRule('unit_price', min_value=0),
+        RangeRule('discount_percent', min_value=0, max_value=100),
+    ] + enum_rules('fact_sales')
+    
+    if customer_codes is not None:
+        rules.append(ForeignKeyRule('customer_code', customer_codes))
+    if product_codes is not None:
+        rules.append(ForeignKeyRule('product_code', product_codes))
+    if employee_codes is not None:
+        rules.append(ForeignKeyRule('employee_code', employee_codes))
+    
+    return rules
@@ -4,15 +4,27 @@ Runs the ETL pipeline with optional scheduling
 """
 
 import sys
+import queue
 import schedule
 import time
 from pathlib import Path
 from datetime import datetime
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # pragma: no cover - optional dependency
+    Observer = None
+    FileSystemEventHandler = object
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from etl.pipeline import run_pipeline
+from etl.extract import SOURCE_FILES
+from etl.pipeline import ETLPipeline, run_pipeline
+
+# The watch-folder daemon only reacts to the files the pipeline reads
+WATCHED_FILES = frozenset(SOURCE_FILES.values())
 
 
 def run_scheduled_pipeline(data_path='data/sample'):
@@ -64,16 +76,191 @@ def schedule_pipeline(data_path='data/sample', schedule_time='02:00'):
         print("\n\nScheduler stopped by user")
 
 
+class MicroBatcher:
+    """
+    Decides when landed data is worth a pipeline run
+    
+    Only the bytes landed since a file's last observed size count toward
+    batch_bytes, so appending a row to a large file does not flush a batch
+    by itself. Which files changed is not kept: the pipeline's source
+    manifest and sales tail offsets already pick out the new data.
+    """
+    
+    def __init__(self, batch_bytes, batch_window, sizes=None):
+        self.batch_bytes = batch_bytes
+        self.batch_window = batch_window
+        self.sizes = dict(sizes or {})
+        self.landed = 0
+        self.opened_at = None
+    
+    def add(self, path, size):
+        previous = self.sizes.get(path, 0)
+        self.sizes[path] = size
+        # A file that did not grow was rewritten, so all of it is new
+        landed = size - previous if size > previous else size
+        if not landed:
+            return
+        if self.opened_at is None:
+            self.opened_at = time.monotonic()
+        self.landed += landed
+    
+    def ready(self):
+        if self.opened_at is None:
+            return False
+        return (self.landed >= self.batch_bytes
+                or time.monotonic() - self.opened_at >= self.batch_window)
+    
+    def drain(self):
+        landed = self.landed
+        self.landed = 0
+        self.opened_at = None
+        return landed
+
+
+class _LandedFileHandler(FileSystemEventHandler):
+    """Forwards created and modified file paths from inotify to a queue"""
+    
+    def __init__(self, events):
+        self.events = events
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.events.put(Path(event.src_path))
+    
+    def on_modified(self, event):
+        self.on_created(event)
+    
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.events.put(Path(event.dest_path))
+
+
+def _is_watched(path):
+    return path.name in WATCHED_FILES
+
+
+def _scan(data_path):
+    """Snapshot size and mtime of watched files for the polling fallback"""
+    snapshot = {}
+    for path in Path(data_path).iterdir():
+        if path.is_file() and _is_watched(path):
+            stat = path.stat()
+            snapshot[path] = (stat.st_size, stat.st_mtime)
+    return snapshot
+
+
+def _settle(candidates, batcher):
+    """
+    Move candidate files whose size is stable across two checks into the batch
+    
+    Args:
+        candidates: Dictionary of path -> size at the previous check (None
+            when first seen), updated in place
+        batcher: MicroBatcher receiving settled files
+    """
+    for path, last_size in list(candidates.items()):
+        if not path.exists():
+            del candidates[path]
+            continue
+        size = path.stat().st_size
+        if size == last_size:
+            batcher.add(path, size)
+            del candidates[path]
+        else:
+            candidates[path] = size
+
+
+def watch_pipeline(data_path='data/raw', batch_bytes=64 * 1024**2, batch_window=300,
+                   poll_interval=5):
+    """
+    Watch a folder and run the incremental pipeline on micro-batches of new files
+    
+    Only the source files the pipeline reads (SOURCE_FILES) are watched.
+    File events come from inotify (via watchdog) when available, otherwise
+    from polling the folder. A file joins the current batch once its size is
+    stable across two checks. A batch is flushed when batch_bytes of new
+    data have landed or batch_window seconds after it opened, and runs the
+    pipeline with unchanged-source skipping and sales tail extraction, so
+    only the new data is processed.
+    
+    Args:
+        data_path: Path to watch
+        batch_bytes: Flush a batch once this many new bytes have landed
+        batch_window: Flush a batch this many seconds after it opened
+        poll_interval: Seconds between checks
+    """
+    print(f"\nWatching {data_path} for new files "
+          f"({'inotify' if Observer else 'polling'}, window {batch_window}s)")
+    print("Press Ctrl+C to stop\n")
+    
+    candidates = {}
+    events = queue.Queue()
+    observer = None
+    
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(_LandedFileHandler(events), str(data_path), recursive=False)
+        observer.start()
+    
+    # Data already present at startup does not count toward the first batch
+    seen = _scan(data_path)
+    batcher = MicroBatcher(batch_bytes, batch_window,
+                           {path: size for path, (size, _) in seen.items()})
+    
+    try:
+        while True:
+            time.sleep(poll_interval)
+            
+            # Collect paths that changed since the last check
+            if observer is not None:
+                while not events.empty():
+                    path = events.get()
+                    if _is_watched(path) and path.exists():
+                        candidates.setdefault(path, None)
+            else:
+                current = _scan(data_path)
+                for path, signature in current.items():
+                    if seen.get(path) != signature:
+                        candidates.setdefault(path, None)
+                seen = current
+            
+            # Only batch files whose size has settled, i.e. finished landing
+            _settle(candidates, batcher)
+            
+            if batcher.ready():
+                landed = batcher.drain()
+                print(f"\nMicro-batch of {landed} new bytes at {datetime.now()}")
+                try:
+                    pipeline = ETLPipeline(pipeline_name='sales_analytics_etl',
+                                           skip_unchanged=True, tail_sales=True)
+                    pipeline.run(data_path)
+                except Exception as e:
+                    print(f"\n✗ Micro-batch failed at {datetime.now()}: {str(e)}")
+                
+    except KeyboardInterrupt:
+        print("\n\nWatcher stopped by user")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='Run ETL Pipeline')
     parser.add_argument('--data-path', default='data/sample',
                        help='Path to data files (default: data/sample)')
-    parser.add_argument('--schedule', choices=['daily', 'none'], default='none',
-                       help='Schedule mode (default: none - run once)')
+    parser.add_argument('--schedule', choices=['daily', 'watch', 'none'], default='none',
+                       help='Schedule mode (default: none - run once; watch - micro-batch new files)')
     parser.add_argument('--time', default='02:00',
                        help='Scheduled run time in HH:MM format (default: 02:00)')
+    parser.add_argument('--batch-bytes', type=int, default=64 * 1024**2,
+                       help='Watch mode: flush a micro-batch at this many bytes (default: 64 MB)')
+    parser.add_argument('--batch-window', type=int, default=300,
+                       help='Watch mode: flush a micro-batch after this many seconds (default: 300)')
+    parser.add_argument('--poll-interval', type=int, default=5,
+                       help='Watch mode: seconds between folder checks (default: 5)')
     parser.add_argument('--use-raw', action='store_true',
                        help='Use data/raw instead of data/sample')
     
@@ -88,6 +275,8 @@ if __name__ == "__main__":
     try:
         if args.schedule == 'daily':
             schedule_pipeline(data_path, args.time)
+        elif args.schedule == 'watch':
+            watch_pipeline(data_path, args.batch_bytes, args.batch_window, args.poll_interval)
         else:
             run_scheduled_pipeline(data_path)
             